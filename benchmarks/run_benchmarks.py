@@ -0,0 +1,243 @@
+# Benchmark das etapas do app sobre dados sintéticos (1x / 10x / 100x): tempo de parede e pico de memória por etapa.
+# Os resultados ficam em JSON para comparar entre commits; com --baseline, sai com código 1 se alguma etapa regredir.
+#
+# Uso:
+#   python benchmarks/run_benchmarks.py --scales 1 10 100            # grava .cache/bench/results/<commit>.json
+#   python benchmarks/run_benchmarks.py --baseline .cache/bench/results/abc123.json --threshold 0.25
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import carielonba as core
+from carielonba.indexes import build_player_index, build_defense_cube, build_matchup_summary, build_team_rosters
+from synthetic_data import generate
+
+DIR_BENCH = os.path.join(RAIZ, ".cache", "bench")
+AMOSTRA_JOGADORES = 25  # Seleções simuladas na etapa de rerun (jogador + oponente + contexto)
+
+def versao_codigo():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return datetime.now().strftime("%Y%m%d-%H%M%S")
+
+def preparar_dados(escala, regen=False):
+    # Dados sintéticos por escala, gerados uma vez (semente fixa) e reaproveitados entre execuções
+    pasta = os.path.join(DIR_BENCH, "data", f"{escala}x")
+    if regen or not os.path.exists(os.path.join(pasta, core.CSV_STATS)):
+        shutil.rmtree(pasta, ignore_errors=True)
+        generate(pasta, escala)
+    return pasta
+
+def medir(fn, repeticoes):
+    # Melhor tempo entre as repetições (sem tracemalloc) + uma execução extra só para o pico de memória
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        fn()
+        tempos.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    try:
+        fn()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"time_s": min(tempos), "peak_mb": pico / 1e6}
+
+def carregar(pasta, cache_dir, anterior=None):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return core.load_dataset(pasta, anterior=anterior, cache_dir=cache_dir)
+
+def etapas(pasta, tmp):
+    # (nome, função) na ordem do fluxo do app; as funções fecham sobre o dataset já carregado
+    cache_snapshot = os.path.join(tmp, "snapshot")
+    ds = carregar(pasta, cache_snapshot)
+    df = ds.stats
+
+    def load_csv():
+        carregar(pasta, tempfile.mkdtemp(dir=tmp))
+
+    def load_snapshot():
+        carregar(pasta, cache_snapshot)
+
+    # Ingestão incremental: CSV com 1% das linhas a menos carregado antes, depois o arquivo completo
+    # (o tempo da etapa inclui as duas cargas; compare com load_snapshot para isolar o incremento)
+    pasta_inc = os.path.join(tmp, "inc")
+    shutil.copytree(pasta, pasta_inc)
+    csv_inc = os.path.join(pasta_inc, core.CSV_STATS)
+    with open(csv_inc, "rb") as f:
+        conteudo = f.read()
+    linhas = conteudo.split(b"\n")
+    corte = len(linhas) - max(1, len(linhas) // 100)
+
+    def load_incremental():
+        with open(csv_inc, "wb") as f:
+            f.write(b"\n".join(linhas[:corte]) + b"\n")
+        anterior = carregar(pasta_inc, os.path.join(pasta_inc, ".cache"))
+        with open(csv_inc, "wb") as f:
+            f.write(conteudo)
+        return carregar(pasta_inc, os.path.join(pasta_inc, ".cache"), anterior=anterior)
+
+    temporada = core.parse_season_schedule(core.find_schedule_file(pasta), pasta)
+    inicio_agenda = pd.Timestamp(temporada['data'].iloc[0]).normalize().to_pydatetime()
+
+    def piso_linhas():
+        for periodo in core.PERIODOS:
+            core.calc_piso_linhas(df, ds.idx_jogador, ds.linhas, periodo)
+
+    quadros = [core.calc_piso_linhas(df, ds.idx_jogador, ds.linhas, p) for p in core.PERIODOS]
+
+    # Nova versão de linhas.csv com ~2% das linhas alteradas: recálculo incremental a partir do quadro anterior
+    estados = [core.update_piso_linhas(df, ds.idx_jogador, ds.linhas, p)[1] for p in core.PERIODOS]
+    linhas_alteradas = ds.linhas
+    alterar = np.arange(0, len(linhas_alteradas), 50)
+    pts = linhas_alteradas['pts'].astype(str).to_numpy(copy=True)
+    pts[alterar] = "25.5"
+    linhas_alteradas['pts'] = pts
+    # Hashes por linha calculados na carga do linhas.csv (SharedLinhas.row_hashes), fora da etapa
+    hashes_alterados = core.linhas_row_hashes(linhas_alteradas)
+
+    def piso_linhas_delta():
+        for periodo, estado in zip(core.PERIODOS, estados):
+            core.update_piso_linhas(df, ds.idx_jogador, linhas_alteradas, periodo, estado, hashes=hashes_alterados)
+
+    def tips():
+        for quadro in quadros:
+            core.calc_tips(quadro)
+
+    rng = np.random.default_rng(0)
+    jogadores = rng.choice(sorted(ds.idx_jogador), size=min(AMOSTRA_JOGADORES, len(ds.idx_jogador)), replace=False)
+    oponentes = rng.choice(ds.oponentes, size=len(jogadores))
+    stats_config = [("PTS", "Pontos", "pts"), ("REB", "Rebotes", "reb"), ("P+R", "P+R", "pr"), ("AST", "Assistencias", "ast")]
+
+    def rerun_pipeline():
+        # O que cada rerun da tela de análise calcula para uma seleção (jogador, oponente, local, período)
+        for jogador, opp in zip(jogadores, oponentes):
+            selecao = core.analyze_selection(ds, jogador=jogador, oponente=opp, local="Casa", periodo="Últimos 10")
+            linhas_bet = core.linha_do_jogador(ds, jogador, ["pts", "reb", "ast", "pr", "3p"])
+            if not selecao["filtrado"].empty:
+                core.projecao_vs_linha(selecao["filtrado"], linhas_bet, stats_config, selecao["ordenados"])
+                for _, col_df, _, passo in core.MERCADOS_ESCADA:
+                    core.alt_line_ladder(selecao["ordenados"], col_df, passo)
+
+    cache_selecoes = core.AnalysisLRU(max_mb=64)
+
+    def rerun_cached():
+        # Mesmas seleções pelo LRU do processo: primeira execução preenche, as seguintes são só hits
+        for jogador, opp in zip(jogadores, oponentes):
+            chave = (ds.versao, jogador, None, opp, "Casa", "Últimos 10")
+            cache_selecoes.get_or_compute(chave, lambda: core.analyze_selection(
+                ds, jogador=jogador, oponente=opp, local="Casa", periodo="Últimos 10"))
+
+    def rerun_team_overview():
+        # Telas sem jogador: equipe selecionada e visão geral (ordenação da base inteira)
+        core.apply_context_filters(core.select_principal(ds, equipe=ds.equipes[0]), "Geral", "Todos")
+        core.apply_context_filters(core.select_principal(ds), "Geral", "Todos")
+
+    return [
+        ("load_csv", load_csv),
+        ("load_snapshot", load_snapshot),
+        ("load_incremental", load_incremental),
+        ("player_index", lambda: build_player_index(df)),
+        ("defense_cube", lambda: build_defense_cube(df)),
+        ("matchup_summary", lambda: build_matchup_summary(df)),
+        ("team_rosters", lambda: build_team_rosters(df)),
+        ("schedule_parse", lambda: core.parse_season_schedule(core.find_schedule_file(pasta), pasta)),
+        ("schedule_window", lambda: core.schedule_window(temporada, inicio_agenda, 7)),
+        ("piso_linhas", piso_linhas),
+        ("piso_linhas_delta", piso_linhas_delta),
+        ("tips", tips),
+        ("rerun_pipeline", rerun_pipeline),
+        ("rerun_cached", rerun_cached),
+        ("rerun_team_overview", rerun_team_overview),
+    ], len(df)
+
+def rodar(escalas, repeticoes, regen=False):
+    resultados = {}
+    for escala in escalas:
+        pasta = preparar_dados(escala, regen)
+        tmp = tempfile.mkdtemp(prefix=f"carielonba-bench-{escala}x-")
+        try:
+            lista, n_linhas = etapas(pasta, tmp)
+            print(f"\n== {escala}x ({n_linhas} linhas) ==")
+            resultados[str(escala)] = {"rows": n_linhas, "stages": {}}
+            for nome, fn in lista:
+                r = medir(fn, repeticoes)
+                resultados[str(escala)]["stages"][nome] = r
+                print(f"{nome:<22} {r['time_s'] * 1000:>10.1f} ms {r['peak_mb']:>10.1f} MB")
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+    return resultados
+
+def comparar(atual, base, limite, min_delta_s, min_delta_mb):
+    # Regressão: etapa mais lenta (ou com pico maior) que a base além do limite relativo e da folga absoluta
+    regressoes = []
+    for escala, dados in atual["scales"].items():
+        etapas_base = base.get("scales", {}).get(escala, {}).get("stages", {})
+        for nome, r in dados["stages"].items():
+            b = etapas_base.get(nome)
+            if b is None:
+                continue
+            for chave, folga, unidade in [("time_s", min_delta_s, "s"), ("peak_mb", min_delta_mb, "MB")]:
+                if r[chave] > b[chave] * (1 + limite) and r[chave] - b[chave] > folga:
+                    regressoes.append(f"{escala}x {nome}: {chave} {b[chave]:.3f} -> {r[chave]:.3f} {unidade} (+{(r[chave] / b[chave] - 1) * 100:.0f}%)")
+    return regressoes
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das etapas do Carielo NBA sobre dados sintéticos.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10], help="Escalas dos dados (padrão: 1 10; 100x leva vários minutos)")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetições por etapa (vale o melhor tempo)")
+    parser.add_argument("--out", help="Arquivo JSON de saída (padrão: .cache/bench/results/<commit>.json)")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Regressão relativa tolerada (0.25 = 25%%)")
+    parser.add_argument("--min-delta-s", type=float, default=0.01, help="Diferença mínima de tempo (s) para contar como regressão")
+    parser.add_argument("--min-delta-mb", type=float, default=1.0, help="Diferença mínima de pico (MB) para contar como regressão")
+    parser.add_argument("--regen", action="store_true", help="Regera os dados sintéticos")
+    args = parser.parse_args()
+
+    commit = versao_codigo()
+    resultado = {
+        "commit": commit,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "repeat": args.repeat,
+        "scales": rodar(args.scales, args.repeat, args.regen),
+    }
+
+    out = args.out or os.path.join(DIR_BENCH, "results", f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(resultado, f, indent=2)
+    print(f"\nResultados gravados em {out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            base = json.load(f)
+        regressoes = comparar(resultado, base, args.threshold, args.min_delta_s, args.min_delta_mb)
+        if regressoes:
+            print(f"\nRegressões em relação a {base.get('commit', args.baseline)} (limite {args.threshold:.0%}):")
+            for r in regressoes:
+                print(f"  {r}")
+            sys.exit(1)
+        print(f"\nSem regressões em relação a {base.get('commit', args.baseline)} (limite {args.threshold:.0%}).")
+
+if __name__ == "__main__":
+    main()
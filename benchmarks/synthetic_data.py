@@ -0,0 +1,186 @@
+# Gerador de dados sintéticos no formato dos CSVs do app (PlayerStatistics_Clean, linhas, jogadoresnba, jogos).
+# A escala multiplica temporadas, linhas de aposta e calendário: 1x ~ tamanho atual, 10x, 100x.
+#
+# Uso: python benchmarks/synthetic_data.py --scale 10 --out .cache/bench/10x
+import argparse
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from carielonba.constants import TIME_PARA_FULL, ABREV_PARA_FULL, CSV_STATS, CSV_LINHAS, CSV_JOGADORES, CSV_JOGOS
+
+# Proporções observadas no CSV real (1x): 110 datas, ~800 jogos, ~26 linhas por jogo, ~17% sem minutagem
+DATAS_POR_TEMPORADA = 110
+JOGOS_POR_TEMPORADA = 800
+JOGADORES_POR_TIME = 17
+RELACIONADOS_POR_JOGO = 13
+PCT_SEM_MINUTOS = 0.17
+LINHAS_POR_ESCALA = 290
+JOGOS_AGENDA_POR_ESCALA = 520
+
+POSICOES = ["G", "F", "C", "G-F", "F-C", "C-F", "F-G"]
+PESO_POSICOES = [0.40, 0.30, 0.11, 0.08, 0.055, 0.035, 0.02]
+
+NOMES = ["James", "Chris", "Anthony", "Jalen", "Tyrese", "Luka", "Nikola", "Jaylen", "Jayson", "Devin",
+         "Donovan", "Kevin", "Stephen", "Damian", "Zion", "Trae", "Paolo", "Franz", "Scottie", "Evan",
+         "Cade", "Jabari", "Keegan", "Keyonte", "Herbert", "Aaron", "Miles", "Josh", "Derrick", "Dennis",
+         "Andre", "Tari", "Onyeka", "Dāvis", "Kristaps", "Goga", "Jusuf", "Bogdan", "Théo", "Álex"]
+SOBRENOMES = ["Brown", "Smith", "Johnson", "Williams", "Jones", "Davis", "Miller", "Wilson", "Moore", "Taylor",
+              "Anderson", "Thomas", "Jackson", "White", "Harris", "Martin", "Thompson", "Robinson", "Clark", "Lewis",
+              "Walker", "Hall", "Allen", "Young", "King", "Wright", "Hill", "Scott", "Green", "Adams",
+              "Baker", "Nelson", "Carter", "Mitchell", "Roberts", "Turner", "Phillips", "Campbell", "Parker", "Evans",
+              "Edwards", "Collins", "Stewart", "Morris", "Murphy", "Cook", "Rogers", "Morgan", "Cooper", "Peterson",
+              "Jokić", "Dončić", "Porziņģis", "Bogdanović", "Nurkić", "Valančiūnas", "Smith Jr.", "Green II", "Porter Jr.", "Murray III"]
+
+def gerar_jogadores(rng):
+    # Elencos fixos: 30 times x 17 jogadores com nomes únicos (inclui acentos e sufixos como "Jr.")
+    times = list(TIME_PARA_FULL.keys())
+    n = len(times) * JOGADORES_POR_TIME
+    combos = rng.choice(len(NOMES) * len(SOBRENOMES), size=n, replace=False)
+    rank = np.tile(np.arange(JOGADORES_POR_TIME), len(times))
+    minutos = np.clip(36 - rank * 1.9 + rng.normal(0, 2, n), 6, 40)
+    return pd.DataFrame({
+        "Nome": [NOMES[c // len(SOBRENOMES)] for c in combos],
+        "Sobrenome": [SOBRENOMES[c % len(SOBRENOMES)] for c in combos],
+        "Posicao_Jogador": rng.choice(POSICOES, size=n, p=PESO_POSICOES),
+        "ID_Jogador": 1630000 + np.arange(n),
+        "Nome_Time": np.repeat(times, JOGADORES_POR_TIME),
+        "time_idx": np.repeat(np.arange(len(times)), JOGADORES_POR_TIME),
+        "min_base": minutos,
+        # Produção por minuto (varia por jogador)
+        "pts_min": rng.gamma(6, 0.07, n),
+        "reb_min": rng.gamma(4, 0.04, n),
+        "ast_min": rng.gamma(3, 0.03, n),
+        "tres_min": rng.gamma(2, 0.025, n),
+    })
+
+def gerar_estatisticas(rng, jogadores, escala):
+    # Box score de `escala` temporadas (mais recente terminando em fev/2026), do jogo mais novo para o mais antigo
+    n_times = jogadores['time_idx'].max() + 1
+    n_jogos = JOGOS_POR_TEMPORADA * escala
+    fim = datetime(2026, 2, 24)
+    temporada = np.arange(n_jogos) // JOGOS_POR_TEMPORADA
+    dia = rng.integers(0, DATAS_POR_TEMPORADA, n_jogos)
+    offset_dias = temporada * 365 + (DATAS_POR_TEMPORADA - 1 - dia)
+    datas = pd.to_datetime(fim) - pd.to_timedelta(offset_dias, unit='D')
+
+    casa = rng.integers(0, n_times, n_jogos)
+    fora = (casa + rng.integers(1, n_times, n_jogos)) % n_times
+
+    # 13 relacionados por time em cada jogo (sorteio sem reposição dentro do elenco)
+    escolha = np.argsort(rng.random((n_jogos * 2, JOGADORES_POR_TIME)), axis=1)[:, :RELACIONADOS_POR_JOGO]
+    time_lado = np.concatenate([casa, fora])
+    jogador = (time_lado[:, None] * JOGADORES_POR_TIME + escolha).ravel()
+    jogo = np.tile(np.arange(n_jogos), 2).repeat(RELACIONADOS_POR_JOGO)
+    eh_casa = np.repeat(np.r_[np.ones(n_jogos), np.zeros(n_jogos)], RELACIONADOS_POR_JOGO)
+    oponente = np.concatenate([fora, casa]).repeat(RELACIONADOS_POR_JOGO)
+
+    j = jogadores.iloc[jogador]
+    n = len(jogador)
+    sem_minutos = rng.random(n) < PCT_SEM_MINUTOS
+    minutos = np.clip(j['min_base'].to_numpy() + rng.normal(0, 4, n), 1, 52)
+    fator = np.where(sem_minutos, 0, minutos)
+    pts = rng.poisson(j['pts_min'].to_numpy() * fator)
+    reb_def = rng.poisson(j['reb_min'].to_numpy() * fator * 0.75)
+    reb_of = rng.poisson(j['reb_min'].to_numpy() * fator * 0.25)
+    times = np.array(list(TIME_PARA_FULL.keys()))
+
+    df = pd.DataFrame({
+        "Nome": j['Nome'].to_numpy(),
+        "Sobrenome": j['Sobrenome'].to_numpy(),
+        "Posicao_Jogador": j['Posicao_Jogador'].to_numpy(),
+        "ID_Jogador": j['ID_Jogador'].to_numpy().astype(float),
+        "ID_Jogo": 22000000 + jogo,
+        "Data_Hora_Jogo": datas[jogo].strftime('%d/%m/%Y'),
+        "Nome_Time": j['Nome_Time'].to_numpy(),
+        "Nome_Oponente": times[oponente],
+        "Casa": eh_casa,
+        "Minutos": np.where(sem_minutos, np.nan, np.round(minutos, 2)),
+        "Pontos": pts.astype(float),
+        "Assistencias": rng.poisson(j['ast_min'].to_numpy() * fator).astype(float),
+        "Tocos": rng.poisson(fator * 0.012).astype(float),
+        "Roubos de bola": rng.poisson(fator * 0.025).astype(float),
+        "Erros / Perdas de posse": rng.poisson(fator * 0.045).astype(float),
+        "3PTS_Feitos": np.minimum(rng.poisson(j['tres_min'].to_numpy() * fator), pts // 3).astype(float),
+        "reboundsDefensive": reb_def.astype(float),
+        "reboundsOffensive": reb_of.astype(float),
+        "Rebotes": (reb_def + reb_of).astype(float),
+    })
+    ordem = np.argsort(offset_dias[jogo], kind='stable')  # mais recente primeiro
+    return df.iloc[ordem]
+
+def gerar_linhas(rng, jogadores, escala):
+    # Linhas de aposta: ~60% preenchidas, algumas com vírgula decimal ("12,5") como no arquivo real
+    full_para_abrev = {v: k for k, v in ABREV_PARA_FULL.items()}
+    n = LINHAS_POR_ESCALA * escala
+    j = jogadores.iloc[rng.integers(0, len(jogadores), n)]
+    media = j['min_base'].to_numpy()
+    preenchida = rng.random(n) < 0.6
+    pts = np.round(j['pts_min'].to_numpy() * media * rng.uniform(0.7, 1.1, n)).astype(int)
+    reb = np.round(j['reb_min'].to_numpy() * media * rng.uniform(0.7, 1.1, n)).astype(int)
+
+    def coluna(valores, pct=1.0):
+        vals = pd.Series(valores, dtype=object).astype(str)
+        return vals.where(preenchida & (rng.random(n) < pct), "")
+    linhas = pd.DataFrame({
+        "jogador": (j['Nome'] + " " + j['Sobrenome']).to_numpy(),
+        "equipe": j['Nome_Time'].map(TIME_PARA_FULL).map(full_para_abrev).to_numpy(),
+        "casa": pd.Series(rng.integers(0, 2, n)).astype(str).where(preenchida, "").to_numpy(),
+        "pts": coluna(np.where(rng.random(n) < 0.1, [f"{p},5" for p in pts], pts)),
+        "reb": coluna(reb),
+        "pr": coluna(pts + reb),
+        "ast": coluna(np.round(j['ast_min'].to_numpy() * media).astype(int), 0.3),
+        "3p": coluna(np.round(j['tres_min'].to_numpy() * media).astype(int), 0.2),
+        "aposta": "",
+        "DETALHE": "",
+    })
+    return linhas
+
+def gerar_agenda(rng, escala):
+    # Calendário futuro: ~7 jogos por dia a partir de 01/02/2026, horários entre 13:00 e 22:30 (alguns sem horário)
+    n = JOGOS_AGENDA_POR_ESCALA * escala
+    times = list(ABREV_PARA_FULL.values())
+    casa = rng.integers(0, len(times), n)
+    fora = (casa + rng.integers(1, len(times), n)) % len(times)
+    dia = np.sort(rng.integers(0, int(n / 7.4) + 1, n))
+    minutos = rng.choice(np.r_[0, np.arange(13 * 60, 22 * 60 + 31, 30)], size=n)
+    datas = pd.to_datetime(datetime(2026, 2, 1)) + pd.to_timedelta(dia, unit='D') + pd.to_timedelta(minutos, unit='m')
+    return pd.DataFrame({
+        "gameId": 22600000 + np.arange(n),
+        "data_partida": datas.strftime('%d/%m/%Y %H:%M'),
+        "equipe_casa": np.array(times)[casa],
+        "equipe_fora": np.array(times)[fora],
+    })
+
+def generate(out_dir, escala=1, seed=42):
+    # Grava os quatro CSVs em `out_dir` (mesmos separadores e encodings dos arquivos reais) e devolve os caminhos
+    rng = np.random.default_rng(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    jogadores = gerar_jogadores(rng)
+
+    stats = gerar_estatisticas(rng, jogadores, escala)
+    stats.to_csv(os.path.join(out_dir, CSV_STATS), sep=';', index=False, encoding='utf-8-sig', lineterminator='\r\n')
+
+    gerar_linhas(rng, jogadores, escala).to_csv(os.path.join(out_dir, CSV_LINHAS), sep=';', index=False,
+                                                  encoding='latin1', errors='replace', lineterminator='\r\n')
+
+    df_jog = jogadores[['Nome', 'Sobrenome', 'Posicao_Jogador', 'ID_Jogador']].rename(columns={"Posicao_Jogador": "POS", "ID_Jogador": "player_id"})
+    df_jog['player_id'] = df_jog['player_id'].astype(float)
+    df_jog['image_path'] = "assets/players/" + jogadores['ID_Jogador'].astype(str) + ".png"
+    df_jog.sort_values(by=['Nome', 'Sobrenome']).to_csv(os.path.join(out_dir, CSV_JOGADORES), sep=';', index=False, lineterminator='\r\n')
+
+    gerar_agenda(rng, escala).to_csv(os.path.join(out_dir, CSV_JOGOS), sep=';', index=False, lineterminator='\r\n')
+    return {nome: os.path.join(out_dir, nome) for nome in [CSV_STATS, CSV_LINHAS, CSV_JOGADORES, CSV_JOGOS]}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera CSVs sintéticos no formato do Carielo NBA.")
+    parser.add_argument("--scale", type=int, default=1, help="Multiplicador de tamanho (1, 10, 100...)")
+    parser.add_argument("--out", required=True, help="Pasta de saída")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    for nome, path in generate(args.out, args.scale, args.seed).items():
+        print(f"{nome}: {os.path.getsize(path) / 1e6:.1f} MB")
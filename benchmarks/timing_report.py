@@ -0,0 +1,21 @@
+# Resumo p50 / p95 por etapa do log de tempos gravado pelo app (CARIELONBA_TIMING_LOG, padrão .cache/timings.jsonl)
+#
+# Uso: python benchmarks/timing_report.py [.cache/timings.jsonl] [--last 1000]
+import argparse
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+from carielonba.timing import summarize_timing_log
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resumo dos tempos por etapa dos reruns do app.")
+    parser.add_argument("log", nargs="?", default=os.path.join(RAIZ, ".cache", "timings.jsonl"))
+    parser.add_argument("--last", type=int, help="Considera só os últimos N reruns")
+    args = parser.parse_args()
+    resumo = summarize_timing_log(args.log, args.last)
+    if resumo.empty:
+        print(f"Nenhum registro em {args.log}")
+    else:
+        print(resumo.sort_values(by="p95 ms", ascending=False).to_string(index=False, float_format=lambda v: f"{v:.1f}"))
@@ -0,0 +1,25 @@
+# Núcleo de análise do Carielo NBA: carregamento, índices e cálculos sem dependência do Streamlit.
+# O app (carielonba_web.py) é só a camada de interface sobre estas funções.
+from .constants import (
+    TIME_PARA_FULL, ABREV_PARA_FULL, CSV_STATS, CSV_LINHAS, CSV_JOGADORES, CSV_JOGOS,
+    LOCAIS, PERIODOS, PERIODO_PARA_N, JANELA_MIN, JANELA_MAX, PERIODO_TEMPORADA, MERCADOS_PISO, COLS_MMM,
+    DISTRIBUICAO_STAT, MEIA_VIDA_RECENCIA, MERCADOS_ESCADA, DEGRAUS_ESCADA,
+)
+from .dataset import SharedDataset, SharedLinhas
+from .loader import load_dataset, load_stats_frame, stats_cutoff, load_linhas, load_shared_linhas, load_players_images, file_version, memory_report
+from .indexes import get_defense_slice, build_recency_ranks, build_matchup_summary, get_matchup_summary
+from .names import normalize_name, build_name_resolver, resolve_player_name, resolve_linhas
+from .analysis import (
+    select_principal, periodo_para_n, periodo_label, apply_context_filters, mmm_summary, mmm_from_summary, h2h_rows, h2h_means,
+    defensive_gaps, defense_allowed, SelectionResult, analyze_selection, linha_do_jogador, projecao_vs_linha, parse_alt_lines, alt_line_ladder,
+    linhas_row_hashes, hash_linhas, calc_piso_linhas, update_piso_linhas, calc_tips,
+)
+from .schedule import find_schedule_file, parse_season_schedule, schedule_window, schedule_day_grid, COLS_GRADE_AGENDA, LADO_GRADE_AGENDA
+from .images import make_thumbnail, png_data_uri
+from .timing import RerunTimer, write_timing_log, summarize_timing_log
+from .cache import AnalysisLRU, estimate_nbytes
+from .probability import hit_probabilities, stat_probabilities, sorted_stats, ladder_hit_rates, ladder_thresholds
+from .prefetch import (
+    BackgroundPrefetcher, matchup_selections, matchup_prefetch_tasks, piso_cache_key, piso_prefetch_tasks,
+    PREFETCH_TOP_JOGADORES,
+)
@@ -0,0 +1,413 @@
+import hashlib
+import re
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+
+from .constants import ABREV_PARA_FULL, MERCADOS_PISO, COLS_MMM, DISTRIBUICAO_STAT, MERCADOS_ESCADA
+from .indexes import get_defense_slice, get_matchup_summary, RESUMO_TODOS
+from .names import build_name_resolver, resolve_linhas
+from .cache import estimate_nbytes
+from .probability import hit_probabilities, stat_probabilities, sorted_stats, ladder_hit_rates, ladder_thresholds
+
+
+# --- Seleção e Filtros de Contexto ---
+def select_principal(ds, jogador=None, equipe=None):
+    # Linhas do jogador (pelo índice, mais recente primeiro), da equipe ou de toda a base, ordenadas por data
+    df_completo = ds.stats
+    if jogador:
+        return df_completo.iloc[ds.idx_jogador.get(str(jogador).lower(), [])]
+    if equipe:
+        return df_completo[df_completo['Time_Full'] == equipe].sort_values(by='Data_Hora_Jogo', ascending=False)
+    return df_completo.sort_values(by='Data_Hora_Jogo', ascending=False)
+
+def periodo_para_n(periodo):
+    # "Últimos N" (ou N) -> N; "Todos" / "Temporada" / None -> None (temporada inteira)
+    if isinstance(periodo, (int, np.integer)):
+        return int(periodo)
+    if isinstance(periodo, str) and periodo.startswith("Últimos "):
+        try:
+            return int(periodo.split()[-1])
+        except ValueError:
+            return None
+    return None
+
+def periodo_label(n):
+    # Rótulo canônico do período (chave dos caches e do batch): None -> "Todos", 10 -> "Últimos 10"
+    return "Todos" if n is None else f"Últimos {int(n)}"
+
+def apply_context_filters(df, local="Geral", periodo="Todos", por_jogador=False):
+    # Local da partida (Casa/Fora) e período (últimos N jogos); `df` já vem ordenado do mais recente.
+    # Com `por_jogador`, a janela sai do rank de recência (máscara Rank <= N, sem ordenar nem cortar)
+    if local == "Casa":
+        df = df[df['Casa'] == 1]
+    elif local == "Fora":
+        df = df[df['Casa'] == 0]
+    n_max = periodo_para_n(periodo)
+    if not n_max:
+        return df
+    if por_jogador and 'Rank_Recente' in df.columns:
+        return df[df['Rank_Local' if local in ("Casa", "Fora") else 'Rank_Recente'] <= n_max]
+    return df.head(n_max)
+
+def mmm_summary(df, cols=COLS_MMM):
+    # Mediana / Mínimo / Máximo das colunas existentes; None se nenhuma existir
+    cols_existentes = [c for c in cols if c in df.columns]
+    if not cols_existentes:
+        return None
+    df_mmm = df[cols_existentes].agg(['median', 'min', 'max'])
+    df_mmm.index = ['Mediana', 'Mínimo', 'Máximo']
+    return df_mmm
+
+def mmm_from_summary(linha, cols=COLS_MMM):
+    # Mesmo quadro do mmm_summary, lido de uma linha do resumo materializado (get_matchup_summary)
+    cols_existentes = [c for c in cols if (c, 'median') in linha.index]
+    if not cols_existentes:
+        return None
+    return pd.DataFrame([[linha[(c, agg)] for c in cols_existentes] for agg in ('median', 'min', 'max')],
+                        index=['Mediana', 'Mínimo', 'Máximo'], columns=cols_existentes, dtype='float64')
+
+def _medias_resumo(linha, cols, agg):
+    return pd.Series({c: linha[(c, agg)] for c in cols}, dtype='float64')
+
+# --- Confronto (H2H e Defesa do Oponente) ---
+def h2h_rows(df_principal, oponente):
+    return df_principal[df_principal['Opp_Full'] == oponente]
+
+def h2h_means(df_h2h):
+    return df_h2h[['Pontos', 'Rebotes', 'Assistencias', 'P+R']].mean()
+
+def defensive_gaps(ds, oponente, top=3):
+    # Posições que mais pontuam contra o oponente (média da temporada, posição exata)
+    defesa_opp = get_defense_slice(ds.defesa, oponente)
+    if defesa_opp is None:
+        return None
+    stats_pos = defesa_opp.xs('mean', axis=1, level=1)[['Pontos', 'Rebotes', '3PTS_Feitos']].sort_values(by='Pontos', ascending=False).head(top)
+    return stats_pos.reset_index().rename(columns={"Posicao_Jogador": "POS", "Pontos": "PTS", "Rebotes": "REB", "3PTS_Feitos": "3PTS"})
+
+def defense_allowed(ds, oponente, posicao):
+    # Média cedida pelo oponente à posição (modo "contem": "G" inclui "G-F"); sem a posição, usa o geral do time
+    defesa_opp = get_defense_slice(ds.defesa, oponente, modo="contem")
+    if defesa_opp is None:
+        return None, None
+    if str(posicao) not in defesa_opp.index:
+        return defesa_opp.loc["*"].xs('mean', level=1), "Geral (Time)"
+    return defesa_opp.loc[str(posicao)].xs('mean', level=1), posicao
+
+# --- Resultado por Seleção (memoizável entre sessões) ---
+class SelectionResult:
+    # Resultados de uma seleção (jogador/equipe, oponente, local, período), somente leitura.
+    # DataFrames e Series saem como cópias rasas: a sessão pode alterá-los sem mexer no resultado compartilhado.
+    __slots__ = ('_dados',)
+
+    def __init__(self, dados):
+        object.__setattr__(self, '_dados', dados)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("SelectionResult é somente leitura")
+
+    def __getitem__(self, chave):
+        valor = self._dados[chave]
+        if isinstance(valor, (pd.DataFrame, pd.Series)):
+            return valor.copy(deep=False)
+        return valor
+
+    def get(self, chave, padrao=None):
+        return self[chave] if chave in self._dados else padrao
+
+    def nbytes(self):
+        return estimate_nbytes(self._dados)
+
+def _com_local(df):
+    # Coluna LOCAL_DISPLAY ("Casa"/"Fora") usada nas tabelas
+    df = df.copy()
+    df['LOCAL_DISPLAY'] = df['Casa'].apply(lambda x: "Casa" if x == 1 else "Fora")
+    return df
+
+def analyze_selection(ds, jogador=None, equipe=None, oponente=None, local="Geral", periodo="Todos"):
+    # Tudo o que a tela de análise calcula para uma seleção e não depende de outros widgets:
+    # linhas base e filtradas, tabela de exibição + MMM, H2H, Defensive Gaps e média cedida à posição.
+    # Agregados da temporada inteira (MMM sem janela, H2H e medianas) saem do resumo materializado (ds.resumo)
+    df_principal = select_principal(ds, jogador=jogador, equipe=equipe)
+    df_filtrado = apply_context_filters(df_principal, local, periodo, por_jogador=bool(jogador))
+    posicao = df_principal['Posicao_Jogador'].iloc[0] if 'Posicao_Jogador' in df_principal.columns and not df_principal.empty else "N/A"
+
+    dados = {"principal": df_principal, "filtrado": df_filtrado, "posicao": posicao}
+    if jogador:
+        exibicao = _com_local(df_filtrado)
+        exibicao['Minutos'] = exibicao['Minutos'].fillna(0)
+        # Stats da janela ordenadas: % acima de qualquer linha (Projeção e escada de alt lines) por busca binária
+        ordenados = sorted_stats(df_filtrado, [col for _, col, _, _ in MERCADOS_ESCADA])
+        resumo_local = get_matchup_summary(ds.resumo, jogador, RESUMO_TODOS, local) if periodo_para_n(periodo) is None else None
+        mmm = mmm_from_summary(resumo_local) if resumo_local is not None else mmm_summary(exibicao)
+        dados.update({"exibicao": exibicao, "mmm": mmm,
+                      "ordenados": MappingProxyType({"n": ordenados["n"], "stats": MappingProxyType(ordenados["stats"])})})
+    if oponente:
+        dados["gaps"] = defensive_gaps(ds, oponente)
+    if jogador and oponente:
+        df_h2h = _com_local(h2h_rows(df_principal, oponente))
+        cedida, cedida_label = defense_allowed(ds, oponente, posicao)
+        resumo = ds.resumo
+        resumo_jogador = get_matchup_summary(resumo, jogador)
+        resumo_h2h = get_matchup_summary(resumo, jogador, oponente)
+        cols_mediana = ['Pontos', 'Rebotes', 'Assistencias']
+        if resumo_h2h is not None:
+            h2h_medias = _medias_resumo(resumo_h2h, ['Pontos', 'Rebotes', 'Assistencias', 'P+R'], 'mean')
+            mmm_h2h = mmm_from_summary(resumo_h2h)
+            mediana_h2h = _medias_resumo(resumo_h2h, cols_mediana, 'median')
+        else:
+            h2h_medias = None
+            mmm_h2h = mmm_summary(df_h2h)
+            mediana_h2h = df_h2h[cols_mediana].median()
+        dados.update({
+            "h2h": df_h2h,
+            "h2h_medias": h2h_medias,
+            "mmm_h2h": mmm_h2h,
+            "cedida": cedida,
+            "cedida_label": cedida_label,
+            "mediana_jogador": (_medias_resumo(resumo_jogador, cols_mediana, 'median') if resumo_jogador is not None
+                                else df_principal[cols_mediana].median()),
+            "mediana_h2h": mediana_h2h,
+        })
+    return SelectionResult(dados)
+
+# --- Linha da Bet e Projeção ---
+def linha_do_jogador(ds, jogador, chaves):
+    # Valores de linhas.csv para o jogador (texto, "" quando ausente), pela chave canônica resolvida no carregamento
+    # (`ds`: SharedDataset ou SharedLinhas)
+    pos = ds.linhas_idx.get(str(jogador).strip().lower())
+    linha = ds.linhas.iloc[pos] if pos is not None else None
+    valores = {}
+    for key in chaves:
+        valores[key] = ""
+        if linha is not None and key in linha.index and pd.notna(linha[key]):
+            valores[key] = str(linha[key])
+    return valores
+
+def projecao_vs_linha(df_filtrado, linhas, stats_config, ordenados=None):
+    # % de jogos acima da mediana e acima da linha informada, mais a probabilidade pelo ajuste de distribuição
+    # e a ponderada pela recência (None se a linha estiver vazia ou inválida).
+    # `ordenados`: sorted_stats da janela (resultado da seleção); sem ele, monta aqui
+    if ordenados is None:
+        ordenados = sorted_stats(df_filtrado, [col_df for _, col_df, _ in stats_config])
+    proj_data = []
+    for label, col_df, key_bet in stats_config:
+        serie = df_filtrado[col_df]
+        ordenado = ordenados["stats"][col_df]
+        mediana = np.median(ordenado) if len(ordenado) else np.nan
+        pct_med = ladder_hit_rates(ordenado, ordenados["n"], [mediana])[0][0]
+
+        pct_line = prob_fit = prob_rec = None
+        linha_val_str = linhas.get(key_bet, "")
+        if linha_val_str:
+            try:
+                linha_val = float(linha_val_str.replace(",", "."))
+                if not np.isfinite(linha_val):
+                    raise ValueError(linha_val_str)  # "inf" / "nan" digitados: linha inválida
+                pct_line = ladder_hit_rates(ordenado, ordenados["n"], [linha_val])[0][0]
+                if linha_val > 0:
+                    _, prob_fit, prob_rec = stat_probabilities(serie, linha_val, col_df)
+            except ValueError:
+                pass
+        proj_data.append({"Stat": label, "% > Med": pct_med, "% > Line": pct_line, "Prob Fit": prob_fit, "Prob Rec": prob_rec})
+    return proj_data
+
+def parse_alt_lines(texto):
+    # "14.5, 17.5 20,5" -> [14.5, 17.5, 20.5]: separadores são espaço, ";" ou ", " (vírgula colada é decimal);
+    # ValueError se algum valor não for número
+    return [float(v.replace(",", ".")) for v in re.split(r"[;\s]+|,\s+", texto.strip()) if v]
+
+def alt_line_ladder(ordenados, col_df, passo, linha=None, limiares=None):
+    # Escada Over / Under de um mercado: limiares informados ou linha principal +/- degraus
+    # (sem linha, centrada na mediana da janela, em x.5); todos os degraus numa única busca binária
+    ordenado = ordenados["stats"].get(col_df)
+    if ordenado is None or ordenados["n"] == 0:
+        return pd.DataFrame()
+    if limiares is None:
+        if linha is None or not 0 < linha < np.inf:
+            linha = np.floor(np.median(ordenado)) + 0.5 if len(ordenado) else passo
+        limiares = ladder_thresholds(linha, passo)
+    limiares = np.unique(np.asarray(limiares, dtype=float))
+    over, under, push = ladder_hit_rates(ordenado, ordenados["n"], limiares)
+    escada = pd.DataFrame({"Linha": limiares, "Over %": over, "Under %": under})
+    if push.any():
+        escada["Push %"] = push
+    return escada
+
+# --- Motor Vetorizado: Piso x Linhas e Tips do Dia ---
+# Abaixo disso o recálculo completo custa o mesmo que o incremental (custo fixo de hashes e junção dos quadros)
+PISO_DELTA_MIN_LINHAS = 500
+
+def linhas_row_hashes(df_linhas):
+    # Hash de cada linha de linhas.csv (conteúdo como texto, incluindo a chave resolvida)
+    return pd.util.hash_pandas_object(df_linhas.astype(str), index=False).to_numpy()
+
+def hash_linhas(df_linhas, hashes=None):
+    # Hash do conteúdo de linhas.csv (usado como chave do cache do quadro de Piso); os hashes por linha entram
+    # na ordem do arquivo, então reordenar as linhas também gera uma versão nova (o quadro segue essa ordem)
+    conteudo = linhas_row_hashes(df_linhas) if hashes is None else hashes
+    digest = hashlib.blake2b(np.ascontiguousarray(conteudo, dtype=np.uint64).tobytes(), digest_size=16).hexdigest()
+    return f"{'|'.join(map(str, df_linhas.columns))}-{len(conteudo)}-{digest}"
+
+def _parse_linha_num(valores):
+    # Converte valores como "12,5" -> 12.5; marca como inválidos os textos que não são número
+    # (vazio/NaN = sem linha). Colunas já numéricas passam direto, sem conversão para texto
+    valores = np.asarray(valores)
+    if valores.dtype.kind in 'iuf':
+        return valores.astype(float), np.zeros(len(valores), dtype=bool)
+    num = np.full(len(valores), np.nan)
+    invalido = np.zeros(len(valores), dtype=bool)
+    for i, v in enumerate(valores):
+        if v is None or v is pd.NA or (isinstance(v, float) and np.isnan(v)):
+            continue
+        txt = str(v).strip().replace(',', '.')
+        if txt.lower() == 'nan':
+            continue
+        try:
+            num[i] = float(txt)
+        except ValueError:
+            invalido[i] = True
+    return num, invalido
+
+def calc_piso_linhas(df_completo, idx_jogador, df_linhas, periodo):
+    # Calcula, para todas as linhas de uma vez, Piso (mínimo), Confiança e Hit Rate de PTS, REB e P+R,
+    # mais a probabilidade de passar a linha pelo ajuste de distribuição e ponderada pela recência
+    return _calc_piso(df_completo, idx_jogador, df_linhas, periodo)[0]
+
+def _calc_piso(df_completo, idx_jogador, df_linhas, periodo, posicoes=None):
+    # (quadro de Piso, posição em df_linhas da linha que originou cada linha do quadro).
+    # `posicoes`: calcula só essas linhas de df_linhas (recálculo incremental); None = todas
+    n_max = periodo_para_n(periodo)
+    posicoes = np.arange(len(df_linhas)) if posicoes is None else np.asarray(posicoes, dtype=int)
+    def col_linhas(nome, padrao=""):
+        # Valores da coluna nas posições calculadas (numpy); coluna ausente vira o valor padrão
+        if nome not in df_linhas.columns:
+            return np.full(len(posicoes), padrao, dtype=object)
+        return df_linhas[nome].to_numpy()[posicoes]
+
+    valores_linha = {}
+    invalido = np.zeros(len(posicoes), dtype=bool)
+    com_linha = np.zeros(len(posicoes), dtype=bool)
+    for mercado, _, key in MERCADOS_PISO:
+        # Coluna de mercado ausente vale 0 (sem linha), como no loop original; só textos não numéricos invalidam a linha
+        valores_linha[mercado], inv = _parse_linha_num(col_linhas(key, 0.0))
+        invalido |= inv
+        com_linha |= valores_linha[mercado] > 0
+
+    # Exibe somente jogadores que tem valores na planilha de linhas preenchidos (pelo menos uma linha > 0)
+    if 'chave_jogador' in df_linhas.columns:
+        chaves = col_linhas('chave_jogador')
+    else:
+        chaves = resolve_linhas(df_linhas, build_name_resolver(df_completo, idx_jogador), idx_jogador)[0].to_numpy()[posicoes]
+    sel, jogos = [], []
+    for i in np.flatnonzero(com_linha & ~invalido):
+        # Join exato pela chave canônica (nomes não resolvidos ficam de fora)
+        pos = idx_jogador.get(chaves[i]) if chaves[i] is not None else None
+        if pos is not None and len(pos) > 0:
+            sel.append(i)
+            jogos.append(pos[:n_max])
+
+    if not sel:
+        return pd.DataFrame(), np.array([], dtype=int)
+
+    sel = np.array(sel)
+    tamanhos = np.array([len(p) for p in jogos])
+    inicio = np.concatenate(([0], np.cumsum(tamanhos)[:-1]))
+    grupo = np.repeat(np.arange(len(sel)), tamanhos)
+    pos_all = np.concatenate(jogos)
+
+    def texto(nome):
+        # Texto sem espaços nas pontas; células vazias continuam NaN (como o .astype(str).str.strip() do pandas)
+        return np.array([v if pd.isna(v) else str(v).strip() for v in col_linhas(nome)[sel]], dtype=object)
+
+    equipes = texto('equipe')
+    colunas = {
+        "EQUIPE": np.array([e if pd.isna(e) else ABREV_PARA_FULL.get(e, e) for e in equipes], dtype=object),
+        "JOGADOR": texto('jogador'),
+    }
+    # Quadro montado de uma vez a partir do dict (inserir coluna a coluna no DF domina o custo com poucas linhas)
+    for mercado, col_df, _ in MERCADOS_PISO:
+        # Estatísticas de todos os jogos selecionados, concatenadas por linha (grupo)
+        vals = df_completo[col_df].to_numpy()[pos_all].astype(float)
+        linha = valores_linha[mercado][sel]
+        tem_linha = linha > 0
+        piso = np.minimum.reduceat(vals, inicio)
+        hits = np.add.reduceat(vals > linha[grupo], inicio)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            conf = np.where(tem_linha, piso / linha * 100, 0.0)
+        _, prob_fit, prob_rec = hit_probabilities(vals, tamanhos, linha, DISTRIBUICAO_STAT[col_df])
+        colunas.update({
+            f"L_{mercado}": np.where(np.isnan(linha), 0, np.trunc(linha)).astype(int),
+            f"MIN {mercado}": piso.astype(int),
+            f"CONF {mercado}": np.trunc(conf).astype(int),
+            f"{mercado} %": np.where(tem_linha, hits / tamanhos * 100, 0.0),
+            f"PROB {mercado}": np.nan_to_num(prob_fit * 100),
+            f"PROB REC {mercado}": np.nan_to_num(prob_rec * 100),
+        })
+    colunas["DETALHE"] = texto('detalhe')
+    return pd.DataFrame(colunas), posicoes[sel]
+
+def update_piso_linhas(df_completo, idx_jogador, df_linhas, periodo, anterior=None, hashes=None):
+    # Piso x Linhas incremental após uma nova versão de linhas.csv (mesmo DF principal e mesmo período):
+    # linhas com conteúdo igual ao da versão anterior reaproveitam a linha do quadro anterior, só as
+    # novas/alteradas são calculadas. Devolve (quadro, estado para a próxima chamada, linhas recalculadas).
+    # `hashes`: linhas_row_hashes(df_linhas) já calculado (SharedLinhas.row_hashes)
+    hashes = linhas_row_hashes(df_linhas) if hashes is None else hashes
+    colunas = tuple(df_linhas.columns)
+    if anterior is None or anterior["colunas"] != colunas or len(df_linhas) < PISO_DELTA_MIN_LINHAS:
+        df_piso, origem = _calc_piso(df_completo, idx_jogador, df_linhas, periodo)
+        return df_piso, {"colunas": colunas, "hashes": hashes, "origem": origem, "piso": df_piso}, len(df_linhas)
+
+    # Linhas já vistas sem linha no quadro (sem linha > 0, nome não resolvido...) continuam sem linha,
+    # porque o resultado de cada linha depende só dela e do DF principal
+    novas = np.flatnonzero(~np.isin(hashes, anterior["hashes"]))
+    df_novo, origem_nova = _calc_piso(df_completo, idx_jogador, df_linhas, periodo, posicoes=novas)
+
+    # hash -> primeira linha do quadro anterior com esse conteúdo (busca binária nos hashes ordenados)
+    hashes_quadro = anterior["hashes"][anterior["origem"]]
+    unicos, primeira = np.unique(hashes_quadro, return_index=True)
+    pos_antigo = np.full(len(df_linhas), -1)
+    if len(unicos):
+        k = np.minimum(np.searchsorted(unicos, hashes), len(unicos) - 1)
+        achou = unicos[k] == hashes
+        pos_antigo[achou] = primeira[k[achou]]
+    pos_novo = np.full(len(df_linhas), -1)
+    pos_novo[origem_nova] = np.arange(len(origem_nova))
+    origem = np.flatnonzero((pos_novo >= 0) | (pos_antigo >= 0))
+
+    base = anterior["piso"]
+    if len(origem) == 0:
+        df_piso = pd.DataFrame()
+    elif df_novo.empty:
+        df_piso = base.take(pos_antigo[origem]).reset_index(drop=True)
+    else:
+        combinado = df_novo if base.empty else pd.concat([base, df_novo], ignore_index=True)
+        sel = np.where(pos_novo >= 0, len(base) + pos_novo, pos_antigo)[origem]
+        df_piso = combinado.take(sel).reset_index(drop=True)
+    return df_piso, {"colunas": colunas, "hashes": hashes, "origem": origem, "piso": df_piso}, len(novas)
+
+def calc_tips(df_piso):
+    # Seleciona o melhor mercado por jogador: Conf >= 70% E Hit >= 60%, maior Power = (Conf + Hit) / 2
+    if df_piso.empty:
+        return pd.DataFrame()
+    mercados = [m for m, _, _ in MERCADOS_PISO]
+    conf = df_piso[[f"CONF {m}" for m in mercados]].to_numpy(dtype=float)
+    hit = np.round(df_piso[[f"{m} %" for m in mercados]].to_numpy(dtype=float))
+    power = np.where((conf >= 70) & (hit >= 60), (conf + hit) / 2, -1.0)
+    melhor = power.argmax(axis=1)
+    melhor_power = power[np.arange(len(power)), melhor]
+    sel = melhor_power >= 0
+
+    df_tips = pd.DataFrame({"JOGADOR": df_piso["JOGADOR"].to_numpy(), "EQUIPE": df_piso["EQUIPE"].to_numpy(),
+                            "MERCADO": np.array(mercados)[melhor]})
+    for j, m in enumerate(mercados):
+        df_tips[f"CONF {m}"] = conf[:, j].astype(int)
+        df_tips[f"HIT {m}"] = hit[:, j].astype(int)
+    df_tips["POWER"] = melhor_power
+    # Probabilidades do mercado escolhido (ajuste de distribuição e ponderada pela recência)
+    if f"PROB {mercados[0]}" in df_piso.columns:
+        linhas_idx = np.arange(len(df_piso))
+        df_tips["PROB"] = df_piso[[f"PROB {m}" for m in mercados]].to_numpy(dtype=float)[linhas_idx, melhor]
+        df_tips["PROB REC"] = df_piso[[f"PROB REC {m}" for m in mercados]].to_numpy(dtype=float)[linhas_idx, melhor]
+    return df_tips[sel].sort_values(by="POWER", ascending=False, kind="mergesort").reset_index(drop=True)
@@ -0,0 +1,134 @@
+# Geração offline dos quadros "Insights de Linhas" (Piso x Linhas) e "Tips do Dia" para todos os períodos.
+# Pensado para rodar no cron depois de cada atualização do linhas.csv; o app lê os resultados se estiverem
+# em dia com os CSVs (mesma versão do CSV principal e mesmo hash do linhas.csv) e só calcula ao vivo se não.
+#
+# Uso: python -m carielonba.batch [--base-dir .] [--out .cache/batch] [--workers 3] [--corte 2023-10-01 | --corte 3]
+import argparse
+import json
+import os
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from .constants import PERIODOS, MERCADOS_PISO
+from .loader import load_dataset, stats_cutoff, _corte_txt
+from .analysis import calc_piso_linhas, calc_tips
+
+MANIFEST = "manifest.json"
+
+def periodo_slug(periodo):
+    # "Últimos 10" -> "ultimos_10" (nome de arquivo)
+    txt = unicodedata.normalize("NFKD", periodo).encode("ascii", "ignore").decode()
+    return "_".join(txt.lower().split())
+
+def _gravar(df, path_sem_ext):
+    # CSV para planilhas e JSON (orient="table", com schema) para o app recarregar com os mesmos tipos;
+    # grava em arquivo temporário e troca no fim para nunca expor um arquivo pela metade
+    for ext, escrever in [
+        (".csv", lambda p: df.to_csv(p, sep=";", index=False, encoding="utf-8-sig")),
+        (".json", lambda p: df.to_json(p, orient="table", index=False, double_precision=15, force_ascii=False)),
+    ]:
+        tmp = path_sem_ext + ext + ".tmp"
+        escrever(tmp)
+        os.replace(tmp, path_sem_ext + ext)
+
+# Entradas do Piso recebidas uma vez por processo worker (initargs), vindas do dataset do processo principal:
+# só as colunas de stats usadas, o índice de jogadores e o mesmo linhas.csv cujo hash vai para o manifesto
+_entradas = None
+
+def _init_worker(stats, idx_jogador, linhas):
+    global _entradas
+    _entradas = (stats, idx_jogador, linhas)
+
+def _gerar_periodo(periodo, out_dir):
+    t0 = time.perf_counter()
+    stats, idx_jogador, linhas = _entradas
+    df_piso = calc_piso_linhas(stats, idx_jogador, linhas, periodo)
+    df_tips = calc_tips(df_piso)
+    slug = periodo_slug(periodo)
+    _gravar(df_piso, os.path.join(out_dir, f"piso_{slug}"))
+    _gravar(df_tips, os.path.join(out_dir, f"tips_{slug}"))
+    return {"periodo": periodo, "piso": f"piso_{slug}.json", "tips": f"tips_{slug}.json",
+            "linhas_piso": len(df_piso), "linhas_tips": len(df_tips), "segundos": round(time.perf_counter() - t0, 3)}
+
+def run_batch(base_dir, out_dir, workers=None, periodos=PERIODOS, cache_dir=None, corte=None, dataset=None):
+    # Calcula Piso/Tips de cada período em processos separados e grava o manifesto por último
+    # (`dataset`: já carregado pelo chamador com o mesmo cache_dir e corte, como no aquecimento)
+    cache_dir = cache_dir or os.path.join(base_dir, ".cache")
+    os.makedirs(out_dir, exist_ok=True)
+
+    # Carga única no processo principal; versão e hash do manifesto descrevem exatamente os dados enviados aos workers
+    if dataset is None:
+        dataset = load_dataset(base_dir, cache_dir=cache_dir, corte=corte)
+    linhas_data = dataset.linhas_data
+    stats = dataset.stats[[col for _, col, _ in MERCADOS_PISO]]
+    manifest = {
+        "versao_stats": dataset.versao,
+        "corte": _corte_txt(corte),
+        "linhas_hash": linhas_data.hash,
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "periodos": {},
+    }
+
+    workers = workers or min(len(periodos), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(stats, dict(dataset.idx_jogador), linhas_data.linhas)) as pool:
+        for r in pool.map(_gerar_periodo, periodos, [out_dir] * len(periodos)):
+            manifest["periodos"][r.pop("periodo")] = r
+
+    tmp = os.path.join(out_dir, MANIFEST + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, os.path.join(out_dir, MANIFEST))
+    return manifest
+
+def _item_atual(out_dir, versao_stats, linhas_hash, periodo, corte):
+    # Entrada do manifesto para o período, ou None se não existir ou estiver desatualizada
+    # (outra versão dos CSVs ou outro corte de datas)
+    try:
+        with open(os.path.join(out_dir, MANIFEST), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    item = manifest.get("periodos", {}).get(periodo)
+    if (item is None or manifest.get("versao_stats") != versao_stats or manifest.get("linhas_hash") != linhas_hash
+            or manifest.get("corte") != _corte_txt(corte)):
+        return None
+    return item
+
+def has_batch_tables(out_dir, versao_stats, linhas_hash, periodo, corte=None):
+    # Se o batch tem os quadros do período para estes arquivos (só lê o manifesto)
+    return _item_atual(out_dir, versao_stats, linhas_hash, periodo, corte) is not None
+
+def load_batch_tables(out_dir, versao_stats, linhas_hash, periodo, corte=None):
+    # (df_piso, df_tips) pré-calculados para o período, ou None se não existirem ou estiverem desatualizados
+    item = _item_atual(out_dir, versao_stats, linhas_hash, periodo, corte)
+    if item is None:
+        return None
+    try:
+        df_piso = pd.read_json(os.path.join(out_dir, item["piso"]), orient="table")
+        df_tips = pd.read_json(os.path.join(out_dir, item["tips"]), orient="table")
+    except (OSError, ValueError) as e:
+        print(f"Erro ao ler resultados do batch ({periodo}): {e}")
+        return None
+    return df_piso, df_tips
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera os quadros de Piso x Linhas e Tips do Dia para todos os períodos.")
+    parser.add_argument("--base-dir", default=".", help="Pasta com os CSVs do app")
+    parser.add_argument("--out", help="Pasta de saída (padrão: <base-dir>/.cache/batch)")
+    parser.add_argument("--workers", type=int, help="Processos worker (padrão: um por período, limitado às CPUs)")
+    parser.add_argument("--corte", default=os.environ.get("CARIELONBA_CORTE", ""),
+                        help="Data mínima dos jogos (AAAA-MM-DD) ou número de temporadas; padrão: CARIELONBA_CORTE, como no app")
+    args = parser.parse_args()
+
+    base_dir = os.path.abspath(args.base_dir)
+    out_dir = args.out or os.path.join(base_dir, ".cache", "batch")
+    t0 = time.perf_counter()
+    manifest = run_batch(base_dir, out_dir, args.workers, corte=stats_cutoff(args.corte))
+    for periodo, r in manifest["periodos"].items():
+        print(f"{periodo:<12} {r['linhas_piso']:>5} linhas | {r['linhas_tips']:>4} tips | {r['segundos']:.2f}s")
+    print(f"Resultados em {out_dir} ({time.perf_counter() - t0:.1f}s)")
@@ -0,0 +1,110 @@
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def estimate_nbytes(valor):
+    # Tamanho aproximado em memória: DataFrames/Series pelo memory_usage(deep=True), contêineres somando os itens
+    if hasattr(valor, "nbytes") and callable(valor.nbytes):
+        return valor.nbytes()
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(deep=True).sum())
+    if isinstance(valor, pd.Series):
+        return int(valor.memory_usage(deep=True))
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(estimate_nbytes(v) for v in valor.values())
+    if isinstance(valor, (list, tuple)):
+        return sys.getsizeof(valor) + sum(estimate_nbytes(v) for v in valor)
+    return sys.getsizeof(valor)
+
+
+class AnalysisLRU:
+    # LRU compartilhado pelo processo (todas as sessões), limitado pela memória estimada dos resultados.
+    # Convenção: o primeiro item da chave é a versão do dataset; ao aparecer uma versão nova,
+    # os resultados das versões anteriores são descartados de uma vez.
+    # Só quem tem o dataset atual (a thread do app) troca a versão: o prefetch usa apenas_versao_atual=True,
+    # e tarefas enfileiradas com uma versão anterior são descartadas em vez de apagar os resultados novos.
+    def __init__(self, max_mb=64):
+        self.max_bytes = int(max_mb * 1e6)
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+        self._versao = None
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejeitados = 0  # Resultados maiores que o limite inteiro (devolvidos sem guardar)
+        self.obsoletos = 0  # Tarefas de prefetch de uma versão que já não é a atual (descartadas sem calcular)
+
+    def _descartar_versoes_antigas(self, versao):
+        for chave in [c for c in self._itens if c[0] != versao]:
+            self.bytes -= self._itens.pop(chave)[1]
+        self._versao = versao
+
+    def set_version(self, versao):
+        # Fixa a versão atual do dataset, descartando os resultados das anteriores
+        with self._lock:
+            if versao != self._versao:
+                self._descartar_versoes_antigas(versao)
+
+    def get_or_compute(self, chave, calcular, apenas_versao_atual=False):
+        # apenas_versao_atual: chave de outra versão devolve None sem calcular (tarefas de prefetch)
+        with self._lock:
+            if chave[0] != self._versao:
+                if apenas_versao_atual:
+                    self.obsoletos += 1
+                    return None
+                self._descartar_versoes_antigas(chave[0])
+            item = self._itens.get(chave)
+            if item is not None:
+                self._itens.move_to_end(chave)
+                self.hits += 1
+                return item[0]
+            self.misses += 1
+
+        # Calculado fora do lock: seleções diferentes não esperam umas pelas outras
+        valor = calcular()
+        tamanho = estimate_nbytes(valor)
+        with self._lock:
+            if chave in self._itens:
+                return self._itens[chave][0]
+            if chave[0] != self._versao:
+                # A versão mudou durante o cálculo: o resultado não é mais guardado
+                return valor
+            if tamanho > self.max_bytes:
+                self.rejeitados += 1
+                return valor
+            self._itens[chave] = (valor, tamanho)
+            self.bytes += tamanho
+            while self.bytes > self.max_bytes:
+                _, (_, t) = self._itens.popitem(last=False)
+                self.bytes -= t
+                self.evictions += 1
+        return valor
+
+    def __contains__(self, chave):
+        # Consulta sem contar hit/miss nem mexer na ordem do LRU (usada pelo prefetch)
+        with self._lock:
+            return chave in self._itens
+
+    def clear(self):
+        with self._lock:
+            self._itens.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            consultas = self.hits + self.misses
+            return {
+                "entradas": len(self._itens),
+                "MB": self.bytes / 1e6,
+                "limite MB": self.max_bytes / 1e6,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit rate": self.hits / consultas if consultas else 0.0,
+                "evictions": self.evictions,
+                "rejeitados": self.rejeitados,
+                "obsoletos": self.obsoletos,
+            }
@@ -0,0 +1,53 @@
+# --- Dicionários e Constantes ---
+TIME_PARA_FULL = {
+    "76ers": "Philadelphia 76ers", "Bucks": "Milwaukee Bucks", "Bulls": "Chicago Bulls",
+    "Cavaliers": "Cleveland Cavaliers", "Celtics": "Boston Celtics", "Clippers": "Los Angeles Clippers",
+    "Grizzlies": "Memphis Grizzlies", "Hawks": "Atlanta Hawks", "Heat": "Miami Heat",
+    "Hornets": "Charlotte Hornets", "Jazz": "Utah Jazz", "Kings": "Sacramento Kings",
+    "Knicks": "New York Knicks", "Lakers": "Los Angeles Lakers", "Magic": "Orlando Magic",
+    "Mavericks": "Dallas Mavericks", "Nets": "Brooklyn Nets", "Nuggets": "Denver Nuggets",
+    "Pacers": "Indiana Pacers", "Pelicans": "New Orleans Pelicans", "Pistons": "Detroit Pistons",
+    "Raptors": "Toronto Raptors", "Rockets": "Houston Rockets", "Spurs": "San Antonio Spurs",
+    "Suns": "Phoenix Suns", "Thunder": "Oklahoma City Thunder", "Timberwolves": "Minnesota Timberwolves",
+    "Trail Blazers": "Portland Trail Blazers", "Warriors": "Golden State Warriors", "Wizards": "Washington Wizards",
+}
+ABREV_PARA_FULL = {
+    "ATL": "Atlanta Hawks", "BOS": "Boston Celtics", "BKN": "Brooklyn Nets", "CHA": "Charlotte Hornets",
+    "CHI": "Chicago Bulls", "CLE": "Cleveland Cavaliers", "DAL": "Dallas Mavericks", "DEN": "Denver Nuggets",
+    "DET": "Detroit Pistons", "GSW": "Golden State Warriors", "HOU": "Houston Rockets", "IND": "Indiana Pacers",
+    "LAC": "Los Angeles Clippers", "LAL": "Los Angeles Lakers", "MEM": "Memphis Grizzlies", "MIA": "Miami Heat",
+    "MIL": "Milwaukee Bucks", "MIN": "Minnesota Timberwolves", "NOP": "New Orleans Pelicans", "NYK": "New York Knicks",
+    "OKC": "Oklahoma City Thunder", "ORL": "Orlando Magic", "PHI": "Philadelphia 76ers", "PHX": "Phoenix Suns",
+    "POR": "Portland Trail Blazers", "SAC": "Sacramento Kings", "SAS": "San Antonio Spurs", "TOR": "Toronto Raptors",
+    "UTA": "Utah Jazz", "WAS": "Washington Wizards",
+}
+
+# Nomes dos arquivos de dados (na pasta do app)
+CSV_STATS = "PlayerStatistics_Clean.csv"
+CSV_LINHAS = "linhas.csv"
+CSV_JOGADORES = "jogadoresnba.csv"
+CSV_JOGOS = "jogos.csv"
+
+# Filtros de contexto
+LOCAIS = ["Geral", "Casa", "Fora"]
+PERIODOS = ["Todos", "Últimos 5", "Últimos 10"]
+PERIODO_PARA_N = {"Últimos 5": 5, "Últimos 10": 10}
+# Janela livre de últimos N jogos (slider) ou a temporada inteira
+JANELA_MIN, JANELA_MAX = 3, 82
+PERIODO_TEMPORADA = "Temporada"
+
+# (Sufixo da coluna no quadro, coluna em df_completo, coluna em linhas.csv)
+MERCADOS_PISO = [("PTS", "Pontos", "pts"), ("REB", "Rebotes", "reb"), ("PR", "P+R", "pr")]
+
+# Distribuição do ajuste de probabilidade por stat: Poisson para contagens baixas, normal para PTS e P+R
+DISTRIBUICAO_STAT = {"Pontos": "normal", "P+R": "normal", "Rebotes": "poisson", "Assistencias": "poisson", "3PTS_Feitos": "poisson"}
+# Meia-vida (em jogos) do peso de recência: o jogo de N partidas atrás pesa 0.5 ** (N / meia-vida)
+MEIA_VIDA_RECENCIA = 8
+
+# Escada de linhas alternativas: (rótulo, coluna em df_completo, coluna em linhas.csv, passo entre degraus)
+MERCADOS_ESCADA = [("PTS", "Pontos", "pts", 3.0), ("REB", "Rebotes", "reb", 1.0), ("AST", "Assistencias", "ast", 1.0),
+                   ("P+R", "P+R", "pr", 3.0), ("3PM", "3PTS_Feitos", "3p", 1.0)]
+DEGRAUS_ESCADA = 3  # Degraus de cada lado da linha principal
+
+# Colunas do MMM (Mediana / Mínimo / Máximo)
+COLS_MMM = ['Pontos', 'Rebotes', 'Assistencias', '3PTS_Feitos', 'Tocos', 'Roubos de bola', 'Erros / Perdas de posse']
@@ -0,0 +1,87 @@
+from types import MappingProxyType
+
+from .names import build_linhas_index
+
+
+class SharedLinhas:
+    # linhas.csv já resolvido para as chaves canônicas, com cache próprio no app: as linhas mudam várias vezes
+    # ao dia e são recarregadas sozinhas, sem tocar no DF principal. Somente leitura, como o SharedDataset.
+    __slots__ = ('_linhas', 'nomes', 'linhas_idx', 'versao', 'row_hashes', 'hash')
+
+    def __init__(self, linhas, nomes, versao, row_hashes, hash_conteudo):
+        row_hashes.flags.writeable = False
+        object.__setattr__(self, '_linhas', linhas)
+        # Relatório (não resolvidos / ambíguos) e chave canônica -> linha do jogador em linhas.csv
+        object.__setattr__(self, 'nomes', MappingProxyType(nomes))
+        object.__setattr__(self, 'linhas_idx', MappingProxyType(build_linhas_index(linhas['chave_jogador'])))
+        # Versão do arquivo (tamanho + mtime), hash de cada linha (recálculo incremental do Piso)
+        # e hash do conteúdo (chave dos quadros de Piso/Tips)
+        object.__setattr__(self, 'versao', versao)
+        object.__setattr__(self, 'row_hashes', row_hashes)
+        object.__setattr__(self, 'hash', hash_conteudo)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("SharedLinhas é somente leitura")
+
+    @property
+    def linhas(self):
+        return self._linhas.copy(deep=False)
+
+
+class SharedDataset:
+    # Mantido uma única vez por processo (no app, via st.cache_resource) e lido por todas as sessões.
+    # Cada acesso devolve um DF raso (sem cópia dos dados); com Copy-on-Write (padrão do pandas 3, versão mínima
+    # em requirements.txt), alterações feitas por uma sessão ficam nela e nunca chegam ao objeto compartilhado.
+    __slots__ = ('_stats', 'linhas_data', '_players_images', 'idx_jogador', 'defesa', '_resumo', 'fotos', 'rosters', 'equipes',
+                 'oponentes', 'resolver', 'meta', 'versao')
+
+    # Só guarda: todos os índices chegam prontos (montados em loader.load_dataset)
+    def __init__(self, stats, linhas_data, players_images, idx_jogador, defesa, resumo, rosters, equipes, oponentes,
+                 fotos, resolver, meta, versao):
+        for arr in idx_jogador.values():
+            arr.flags.writeable = False
+        object.__setattr__(self, '_stats', stats)
+        # linhas.csv como estava na carga (o app recarrega as linhas à parte, ver SharedLinhas)
+        object.__setattr__(self, 'linhas_data', linhas_data)
+        object.__setattr__(self, '_players_images', players_images)
+        object.__setattr__(self, 'idx_jogador', MappingProxyType(idx_jogador))
+        # O mapping é somente leitura, mas as tabelas do cubo são as compartilhadas: leia com get_defense_slice,
+        # que devolve cópias rasas
+        object.__setattr__(self, 'defesa', MappingProxyType(defesa))
+        # Resumo jogador x oponente x local (H2H e MMM por lookup), ver build_matchup_summary
+        object.__setattr__(self, '_resumo', resumo)
+        object.__setattr__(self, 'fotos', MappingProxyType(fotos))
+        object.__setattr__(self, 'rosters', MappingProxyType(rosters))
+        object.__setattr__(self, 'equipes', tuple(equipes))
+        object.__setattr__(self, 'oponentes', tuple(oponentes))
+        # Tabelas do resolver de nomes, reaproveitadas para resolver cada nova versão de linhas.csv
+        object.__setattr__(self, 'resolver', MappingProxyType(resolver))
+        object.__setattr__(self, 'meta', MappingProxyType(dict(meta)))
+        object.__setattr__(self, 'versao', versao)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("SharedDataset é somente leitura")
+
+    @property
+    def stats(self):
+        return self._stats.copy(deep=False)
+
+    @property
+    def linhas(self):
+        return self.linhas_data.linhas
+
+    @property
+    def nomes(self):
+        return self.linhas_data.nomes
+
+    @property
+    def linhas_idx(self):
+        return self.linhas_data.linhas_idx
+
+    @property
+    def resumo(self):
+        return self._resumo.copy(deep=False)
+
+    @property
+    def players_images(self):
+        return self._players_images.copy(deep=False)
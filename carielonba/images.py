@@ -0,0 +1,22 @@
+import base64
+import io
+
+
+def make_thumbnail(path, lado):
+    # PNG reduzido (lado máximo em px) e já codificado; Pillow só é importado quando há miniatura a gerar
+    from PIL import Image
+    try:
+        with Image.open(path) as img:
+            img.thumbnail((lado, lado))
+            buffer = io.BytesIO()
+            img.save(buffer, format="PNG", optimize=True)
+            return buffer.getvalue()
+    except OSError as e:
+        print(f"Erro ao gerar miniatura de {path}: {e}")
+        return None
+
+def png_data_uri(png):
+    # Miniatura PNG -> data URI (ImageColumn das tabelas); None quando não há miniatura
+    if not png:
+        return None
+    return "data:image/png;base64," + base64.b64encode(png).decode("ascii")
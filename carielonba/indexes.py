@@ -0,0 +1,215 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# --- Índice de Linhas por Jogador ---
+def build_player_index(df):
+    # Mapeia nome do jogador (minúsculo) -> posições das linhas, já ordenadas da partida mais recente para a mais antiga
+    ordem = df['Data_Hora_Jogo'].reset_index(drop=True).sort_values(ascending=False, kind='mergesort').index.to_numpy()
+    chaves = df['Nome_Full'].astype(str).str.lower().to_numpy()[ordem]
+    grupos = pd.Series(ordem).groupby(chaves, sort=False).indices
+    return {nome: ordem[pos] for nome, pos in grupos.items()}
+
+def update_player_index(idx_jogador, df, inicio):
+    # Incorpora as linhas a partir de `inicio` (append) ao índice; só os jogadores com jogos novos são reordenados
+    idx_jogador = dict(idx_jogador)
+    datas = df['Data_Hora_Jogo'].to_numpy()
+    for nome, pos in build_player_index(df.iloc[inicio:]).items():
+        pos = pos + inicio
+        if nome in idx_jogador:
+            pos = np.concatenate([idx_jogador[nome], pos])
+            ordem = pd.Series(datas[pos]).sort_values(ascending=False, kind='mergesort').index.to_numpy()
+            pos = pos[ordem]
+        idx_jogador[nome] = pos
+    return idx_jogador
+
+# --- Rank de Recência por Jogador ---
+COLS_RANK = ['Rank_Recente', 'Rank_Local']
+
+def build_recency_ranks(df, idx_jogador):
+    # 1 = jogo mais recente do jogador; Rank_Local conta só os jogos no mesmo local (Casa/Fora).
+    # Calculado uma vez no carregamento a partir do índice: "últimos N" vira a máscara Rank <= N
+    rank = np.zeros(len(df), dtype=np.int32)
+    rank_local = np.zeros(len(df), dtype=np.int32)
+    if not idx_jogador:
+        return rank, rank_local
+    pos = np.concatenate(list(idx_jogador.values()))
+    tamanhos = np.fromiter((len(p) for p in idx_jogador.values()), dtype=np.int64, count=len(idx_jogador))
+    inicio = np.repeat(np.cumsum(tamanhos) - tamanhos, tamanhos)
+    rank[pos] = np.arange(len(pos)) - inicio + 1
+    # Grupo (jogador, local) preservando a ordem do índice: a contagem acumulada é o rank no local
+    grupo = np.repeat(np.arange(len(tamanhos)), tamanhos) * 2 + df['Casa'].to_numpy()[pos]
+    rank_local[pos] = pd.Series(grupo).groupby(grupo).cumcount().to_numpy() + 1
+    return rank, rank_local
+
+# --- Cubo de Defesa: Oponente x Posição ("Média Cedida") ---
+COLS_DEFESA = ['Pontos', 'Rebotes', 'Assistencias', '3PTS_Feitos']
+CUBO_LOCAIS = {"Geral": None, "Casa": 1, "Fora": 0}  # Local do jogador que enfrenta o oponente
+CUBO_ULTIMOS = (None, 5, 10)  # None = temporada inteira; N = últimos N jogos do oponente
+
+def _agregar_defesa(df_rows, col_pos):
+    g = df_rows.groupby(['Opp_Full', col_pos], observed=True)
+    tabela = g[COLS_DEFESA].agg(['mean', 'median'])
+    tabela[('Jogos', 'count')] = g['ID_Jogo'].nunique()
+    tabela[('Amostras', 'count')] = g.size()
+    return tabela
+
+def build_defense_cube(df, oponentes=None):
+    # Materializa, uma vez por versão do dataset, o que cada oponente cede por posição (média/mediana de PTS, REB, AST, 3PM).
+    # Chave: (oponente, local, últimos N, modo) -> DF indexado pela posição.
+    # modo "exata": posição exatamente igual; modo "contem": posições que contêm o rótulo (ex.: "G" inclui "G-F"),
+    # com a linha "*" reunindo todas as posições (fallback "Geral (Time)").
+    # `oponentes`: monta só as tabelas desses oponentes (os rótulos de posição continuam vindo do DF inteiro)
+    cols = ['Opp_Full', 'Posicao_Jogador', 'Casa', 'ID_Jogo', 'Data_Hora_Jogo'] + COLS_DEFESA
+    rotulos = sorted(df['Posicao_Jogador'].dropna().astype(str).unique())
+    base = (df[cols] if oponentes is None else df.loc[df['Opp_Full'].isin(oponentes), cols]).copy()
+    base['Posicao_Jogador'] = base['Posicao_Jogador'].astype(object)
+
+    # Recência dos jogos de cada oponente (1 = jogo mais recente)
+    jogos_opp = base[['Opp_Full', 'ID_Jogo', 'Data_Hora_Jogo']].drop_duplicates(['Opp_Full', 'ID_Jogo'])
+    jogos_opp['rank_opp'] = jogos_opp.groupby('Opp_Full', observed=True)['Data_Hora_Jogo'].rank(method='first', ascending=False)
+    base = base.merge(jogos_opp[['Opp_Full', 'ID_Jogo', 'rank_opp']], on=['Opp_Full', 'ID_Jogo'], how='left')
+
+    # Versão "explodida" para o modo "contem": cada linha repetida para cada rótulo contido na sua posição
+    pos_txt = base['Posicao_Jogador'].astype(str)
+    partes = [base.assign(Pos_Chave="*")]
+    for rotulo in rotulos:
+        mask = pos_txt.str.contains(rotulo, regex=False) & base['Posicao_Jogador'].notna()
+        partes.append(base[mask].assign(Pos_Chave=rotulo))
+    base_contem = pd.concat(partes, ignore_index=True)
+
+    cubo = {}
+    for local, casa in CUBO_LOCAIS.items():
+        for n in CUBO_ULTIMOS:
+            for modo, df_rows, col_pos in (("exata", base, 'Posicao_Jogador'), ("contem", base_contem, 'Pos_Chave')):
+                mask = np.ones(len(df_rows), dtype=bool)
+                if casa is not None:
+                    mask &= (df_rows['Casa'] == casa).to_numpy()
+                if n is not None:
+                    mask &= (df_rows['rank_opp'] <= n).to_numpy()
+                tabela = _agregar_defesa(df_rows[mask], col_pos)
+                for opp, tabela_opp in tabela.groupby(level=0, observed=True):
+                    tabela_opp = tabela_opp.droplevel(0)
+                    tabela_opp.index.name = 'Posicao_Jogador'
+                    cubo[(opp, local, n, modo)] = tabela_opp
+    return cubo
+
+def update_defense_cube(cubo, df, inicio):
+    # Incorpora as linhas a partir de `inicio` (append): só os oponentes com jogos novos são reagregados
+    # (a recência "últimos N" é contada por oponente, então as tabelas dos demais não mudam).
+    # Uma rodada inteira toca quase todos os oponentes: acima da metade, o cálculo completo custa o mesmo
+    oponentes = set(df['Opp_Full'].iloc[inicio:].dropna().unique())
+    if not oponentes:
+        return dict(cubo)
+    if len(oponentes) * 2 > df['Opp_Full'].nunique():
+        return build_defense_cube(df)
+    cubo = {chave: tabela for chave, tabela in cubo.items() if chave[0] not in oponentes}
+    cubo.update(build_defense_cube(df, oponentes))
+    return cubo
+
+def get_defense_slice(cubo, oponente, local="Geral", ultimos=None, modo="exata"):
+    # Lookup O(1) no cubo; None quando o oponente não tem jogos no recorte.
+    # Cópia rasa: escritas de quem chama (Copy-on-Write) não alteram a tabela compartilhada
+    tabela = cubo.get((oponente, local, ultimos, modo))
+    return tabela.copy(deep=False) if tabela is not None else None
+
+# --- Resumo Jogador x Oponente x Local (H2H e MMM) ---
+COLS_RESUMO = ['Pontos', 'Rebotes', 'Assistencias', '3PTS_Feitos', 'Tocos', 'Roubos de bola', 'Erros / Perdas de posse', 'P+R']
+AGGS_RESUMO = ['median', 'min', 'max', 'mean']
+RESUMO_TODOS = "*"  # Oponente "*" = todos os jogos do jogador no local
+
+def build_matchup_summary(df):
+    # Jogos + mediana / mínimo / máximo / média de cada stat por (jogador minúsculo, oponente, local),
+    # com os totais "Geral" (os dois locais) e RESUMO_TODOS (todos os oponentes). Montado uma vez por versão
+    # do dataset: os painéis de H2H e MMM viram lookups em vez de groupbys a cada rerun
+    cols = [c for c in COLS_RESUMO if c in df.columns]
+    chaves = pd.DataFrame({
+        'jogador': df['Nome_Full'].astype(str).str.lower().to_numpy(),
+        'oponente': df['Opp_Full'].astype(str).to_numpy(),
+        'local': np.where(df['Casa'].to_numpy() == 1, "Casa", "Fora"),
+    })
+    valores = df[cols].reset_index(drop=True)
+    partes = []
+    for oponente, local in [(None, None), (None, "Geral"), (RESUMO_TODOS, None), (RESUMO_TODOS, "Geral")]:
+        grupo = chaves.assign(**{k: v for k, v in (("oponente", oponente), ("local", local)) if v is not None})
+        g = valores.groupby([grupo['jogador'], grupo['oponente'], grupo['local']], sort=False)
+        resumo = g.agg(AGGS_RESUMO)
+        resumo[('Jogos', 'count')] = g.size()
+        partes.append(resumo)
+    resumo = pd.concat(partes).sort_index()
+    resumo.index.names = ['jogador', 'oponente', 'local']
+    return resumo
+
+def update_matchup_summary(resumo, df, idx_jogador, inicio):
+    # Incorpora as linhas a partir de `inicio` (append): só os jogadores com jogos novos são reagregados,
+    # a partir das linhas deles no índice (na ordem original do DF, como no cálculo completo)
+    jogadores = df['Nome_Full'].iloc[inicio:].astype(str).str.lower().unique()
+    if not len(jogadores):
+        return resumo
+    pos = np.sort(np.concatenate([idx_jogador[j] for j in jogadores]))
+    if len(pos) * 2 > len(df):
+        return build_matchup_summary(df)
+    mantidos = resumo[~resumo.index.get_level_values('jogador').isin(jogadores)]
+    return pd.concat([mantidos, build_matchup_summary(df.iloc[pos])]).sort_index()
+
+def get_matchup_summary(resumo, jogador, oponente=RESUMO_TODOS, local="Geral"):
+    # Lookup no resumo materializado; None quando o jogador não tem jogos no recorte
+    try:
+        return resumo.loc[(str(jogador).lower(), oponente, local)]
+    except KeyError:
+        return None
+
+# --- Elencos por Equipe (ordenados por média de minutos) ---
+def build_team_rosters(df):
+    # Equipe -> jogadores ordenados pela média de minutos (desc.), calculado uma vez por versão do dataset
+    medias = df.groupby(['Time_Full', 'Nome_Full'], observed=True)['Minutos'].mean()
+    rosters = {}
+    for equipe, medias_eq in medias.groupby(level=0, observed=True):
+        rosters[equipe] = tuple(medias_eq.droplevel(0).sort_values(ascending=False).index)
+    return rosters
+
+def update_team_rosters(rosters, df, inicio):
+    # Incorpora as linhas a partir de `inicio` (append): só as equipes com jogos novos são reordenadas
+    equipes = df['Time_Full'].iloc[inicio:].dropna().unique()
+    if len(equipes) * 2 > df['Time_Full'].nunique():
+        return build_team_rosters(df)
+    rosters = dict(rosters)
+    if len(equipes):
+        rosters.update(build_team_rosters(df[df['Time_Full'].isin(equipes)]))
+    return rosters
+
+def sorted_teams(serie):
+    # Lista ordenada de equipes/oponentes para os selectbox
+    return tuple(sorted(e for e in serie.unique() if str(e) != 'nan'))
+
+# --- Fotos dos Jogadores ---
+def build_photo_index(df_players_images, base_dir):
+    # Nome do jogador (minúsculo) -> caminho da foto, montado com uma única varredura de assets/players
+    dir_players = os.path.join(base_dir, "assets", "players")
+    arquivos = set(os.listdir(dir_players)) if os.path.isdir(dir_players) else set()
+
+    def existe(path):
+        if os.path.dirname(path) == dir_players:
+            return os.path.basename(path) in arquivos
+        return os.path.exists(path)
+
+    fotos = {}
+    if df_players_images is not None and {'Nome_Full', 'image_path'} <= set(df_players_images.columns):
+        vistos = set()
+        for nome, rel_path in zip(df_players_images['Nome_Full'].astype(str).str.lower(), df_players_images['image_path']):
+            # Vale o primeiro registro de cada nome
+            if nome in vistos:
+                continue
+            vistos.add(nome)
+            if pd.notna(rel_path):
+                path = os.path.join(base_dir, str(rel_path).replace("/", os.sep))
+                if existe(path):
+                    fotos[nome] = path
+
+    # Fallback: fotos salvas com o nome do jogador (ex.: "Jaylen Brown.png")
+    for arquivo in arquivos:
+        if arquivo.lower().endswith(".png"):
+            fotos.setdefault(arquivo[:-4].lower(), os.path.join(dir_players, arquivo))
+    return fotos
@@ -0,0 +1,385 @@
+import io
+import json
+import hashlib
+import os
+from datetime import date
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from .constants import TIME_PARA_FULL, CSV_STATS, CSV_LINHAS, CSV_JOGADORES
+from .dataset import SharedDataset, SharedLinhas
+from .analysis import linhas_row_hashes, hash_linhas
+from .names import build_name_resolver, resolve_linhas
+from .indexes import (
+    build_player_index, update_player_index, build_recency_ranks, build_defense_cube, update_defense_cube, build_matchup_summary,
+    update_matchup_summary, build_team_rosters, update_team_rosters, sorted_teams, build_photo_index, COLS_RANK,
+)
+
+
+# --- Schema Tipado do DF Principal ---
+# Incrementar ao mudar o schema: invalida snapshots gravados com o schema anterior
+SCHEMA_VERSION = 2
+COLS_CATEGORIA = ['Nome', 'Sobrenome', 'Nome_Full', 'Posicao_Jogador', 'Nome_Time', 'Nome_Oponente', 'Time_Full', 'Opp_Full', 'Data_Limpa']
+COLS_CONTAGEM = ['Pontos', 'Rebotes', 'Assistencias', '3PTS_Feitos', 'Tocos', 'Roubos de bola', 'Erros / Perdas de posse']
+
+# Colunas do CSV lidas pelo app (as demais, ex.: ID_Jogador e rebotes ofensivos/defensivos, nem entram na memória)
+# e o tipo de cada uma já na leitura; contagens vêm como "3.0" e viram int16 no schema
+DTYPES_CSV = {
+    'Nome': str, 'Sobrenome': str, 'Posicao_Jogador': str, 'Nome_Time': str, 'Nome_Oponente': str, 'Data_Hora_Jogo': str,
+    'ID_Jogo': 'float64', 'Casa': 'float32', 'Minutos': 'float64', **{c: 'float32' for c in COLS_CONTAGEM},
+}
+CHUNK_LINHAS = 200_000  # Linhas por bloco na leitura do CSV (limita o pico de memória da carga)
+MES_INICIO_TEMPORADA = 8  # Temporadas da NBA começam em outubro; agosto separa uma temporada da outra
+
+def apply_stats_schema(df):
+    # Aplica os tipos uma única vez no carregamento: categorias para textos repetidos, inteiros pequenos para o box score
+    for c in COLS_CONTAGEM:
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors='coerce').fillna(0).astype('int16')
+    if 'Minutos' in df.columns:
+        # Minutos mantém NaN (jogo sem minutagem registrada) para não distorcer a média do elenco;
+        # fica em float64 porque o float32 exibe 36.01 como 36.0099983 nas tabelas
+        df['Minutos'] = pd.to_numeric(df['Minutos'], errors='coerce')
+    if 'Casa' in df.columns:
+        df['Casa'] = pd.to_numeric(df['Casa'], errors='coerce').fillna(0).astype('int8')
+    for c in ['ID_Jogador', 'ID_Jogo']:
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors='coerce').astype('Int32')
+    for c in COLS_CATEGORIA:
+        if c in df.columns:
+            df[c] = df[c].astype('category')
+    df['P+R'] = (df['Pontos'] + df['Rebotes']).astype('int16')
+    return df
+
+def memory_report(df):
+    # Memória por coluna do DF (deep) e RSS atual do processo, para acompanhar o consumo por worker
+    por_coluna = df.memory_usage(deep=True, index=False)
+    rss_mb = None
+    try:
+        with open('/proc/self/statm') as f:
+            rss_mb = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except (OSError, ValueError, AttributeError):
+        try:
+            import resource
+            rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+        except ImportError:
+            pass
+    report = pd.DataFrame({"dtype": df.dtypes.astype(str), "MB": por_coluna / 1e6}).sort_values(by="MB", ascending=False)
+    return report, por_coluna.sum() / 1e6, rss_mb
+
+# --- Snapshot Colunar (Parquet) do DF Principal ---
+def stats_cutoff(valor, hoje=None):
+    # Corte opcional do histórico: "" / None = sem corte; "2023-10-01" = data; "3" = as 3 últimas temporadas
+    # (a atual inclusive, contando do início em agosto). Valor inválido: aviso e sem corte
+    valor = str(valor or "").strip()
+    if not valor:
+        return None
+    try:
+        if valor.isdigit():
+            hoje = hoje or date.today()
+            inicio_atual = hoje.year if hoje.month >= MES_INICIO_TEMPORADA else hoje.year - 1
+            return pd.Timestamp(inicio_atual - (int(valor) - 1), MES_INICIO_TEMPORADA, 1)
+        return pd.Timestamp(valor)
+    except (ValueError, OverflowError) as e:
+        print(f"Erro no corte de datas '{valor}' (use AAAA-MM-DD ou número de temporadas), carregando sem corte: {e}")
+        return None
+
+def _preparar_bloco(bloco, corte=None):
+    # Um bloco do CSV no schema final: datas, colunas derivadas e tipos (com o corte de datas aplicado antes)
+    bloco.columns = [c.strip() for c in bloco.columns]
+    datas_txt = bloco['Data_Hora_Jogo'].astype(str).str.strip()
+    datas = pd.to_datetime(datas_txt, format='%d/%m/%Y', errors='coerce')
+    # Fallback para linhas fora do formato padrão (ex.: com horário)
+    falhas = datas.isna() & bloco['Data_Hora_Jogo'].notna()
+    if falhas.any():
+        datas[falhas] = pd.to_datetime(datas_txt[falhas], dayfirst=True, errors='coerce')
+    bloco['Data_Hora_Jogo'] = datas
+    if corte is not None:
+        bloco = bloco[bloco['Data_Hora_Jogo'] >= corte].reset_index(drop=True)
+    bloco['Data_Limpa'] = bloco['Data_Hora_Jogo'].dt.strftime('%d/%m/%Y')
+    bloco['Time_Full'] = bloco['Nome_Time'].astype(str).map(TIME_PARA_FULL).fillna(bloco['Nome_Time'].astype(str))
+    bloco['Opp_Full'] = bloco['Nome_Oponente'].astype(str).map(TIME_PARA_FULL).fillna(bloco['Nome_Oponente'].astype(str))
+    bloco['Nome_Full'] = bloco['Nome'].astype(str).str.strip() + " " + bloco['Sobrenome'].astype(str).str.strip()
+    return apply_stats_schema(bloco)
+
+def concat_stats_frames(partes):
+    # Junta blocos já no schema; categorias unidas (e ordenadas, como no astype('category') de um bloco só)
+    if len(partes) == 1:
+        return partes[0]
+    colunas = {}
+    for c in partes[0].columns:
+        if isinstance(partes[0][c].dtype, pd.CategoricalDtype):
+            colunas[c] = pd.Series(union_categoricals([p[c] for p in partes], sort_categories=True))
+        else:
+            colunas[c] = pd.concat([p[c] for p in partes], ignore_index=True)
+    return pd.DataFrame(colunas)
+
+def parse_stats_csv(csv_file, corte=None, chunksize=CHUNK_LINHAS):
+    # Leitura do CSV em blocos, só com as colunas usadas e tipos explícitos; cada bloco já sai no schema final
+    # (sem as linhas anteriores ao `corte`), então o pico de memória fica limitado a um bloco de texto por vez.
+    # Caminho lento, usado apenas quando o arquivo muda
+    def ler(dtypes):
+        if hasattr(csv_file, 'seek'):
+            csv_file.seek(0)
+        leitor = pd.read_csv(csv_file, sep=';', encoding='utf-8-sig', usecols=lambda c: c.strip() in DTYPES_CSV,
+                             dtype=dtypes, chunksize=chunksize)
+        return [_preparar_bloco(bloco, corte) for bloco in leitor]
+    try:
+        partes = ler(DTYPES_CSV)
+    except ValueError as e:
+        # Texto em coluna numérica: lê como texto e deixa o schema converter (valores inválidos viram 0 / NaN)
+        print(f"Erro nos tipos de {csv_file}, lendo colunas numéricas como texto: {e}")
+        partes = ler(str)
+    return concat_stats_frames(partes)
+
+def parse_stats_tail(csv_file, offset, corte=None):
+    # Parse apenas dos bytes anexados depois de `offset`, reaproveitando o cabeçalho do arquivo
+    with open(csv_file, 'rb') as f:
+        cabecalho = f.readline()
+        f.seek(offset)
+        cauda = f.read()
+    return parse_stats_csv(io.BytesIO(cabecalho + cauda), corte)
+
+def append_stats_rows(df_base, df_novo):
+    # Junta as linhas novas ao DF existente, unindo as categorias para não perder o tipo 'category'
+    for c in COLS_CATEGORIA:
+        if c in df_base.columns and c in df_novo.columns:
+            cats = df_base[c].cat.categories.union(df_novo[c].cat.categories)
+            df_base = df_base.assign(**{c: df_base[c].cat.set_categories(cats)})
+            df_novo = df_novo.assign(**{c: df_novo[c].cat.set_categories(cats)})
+    return pd.concat([df_base, df_novo[df_base.columns]], ignore_index=True)
+
+def _md5_prefixo(path, n_bytes):
+    h = hashlib.md5()
+    restante = n_bytes
+    with open(path, 'rb') as f:
+        while restante > 0:
+            bloco = f.read(min(1 << 20, restante))
+            if not bloco:
+                break
+            h.update(bloco)
+            restante -= len(bloco)
+    return h.hexdigest()
+
+def _corte_txt(corte):
+    return corte.strftime('%Y-%m-%d') if corte is not None else None
+
+def file_signature(path, corte=None):
+    # Assinatura do arquivo fonte: tamanho, mtime e hash do conteúdo (+ schema e corte de datas do DF gerado)
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime": stat.st_mtime_ns, "md5": _md5_prefixo(path, stat.st_size), "schema": SCHEMA_VERSION,
+            "corte": _corte_txt(corte)}
+
+def is_append_only(path, meta):
+    # O arquivo só cresceu e os bytes antigos (terminados em quebra de linha) continuam idênticos
+    tamanho_antigo = meta.get("size", 0)
+    if tamanho_antigo <= 0 or os.path.getsize(path) <= tamanho_antigo:
+        return False
+    with open(path, 'rb') as f:
+        f.seek(tamanho_antigo - 1)
+        if f.read(1) != b'\n':
+            return False
+    return _md5_prefixo(path, tamanho_antigo) == meta.get("md5")
+
+# --- Snapshot Parquet ---
+# O .cache é lido por outros processos (réplicas, aquecimento, batch): Parquet e meta são gravados em arquivos
+# temporários e trocados com os.replace, e o Parquet leva a própria assinatura (+ nº de linhas) nos metadados,
+# conferida na leitura; um Parquet novo com o meta antigo (ou o contrário) nunca é tomado como base válida
+CHAVE_META_PARQUET = b"carielonba"
+CAMPOS_ASSINATURA = ("size", "md5", "schema", "corte")  # mtime fica de fora: o meta é renovado sem regravar o Parquet
+
+def _tmp(path):
+    return f"{path}.{os.getpid()}.tmp"
+
+def _gravar_meta(meta_file, meta):
+    tmp = _tmp(meta_file)
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    os.replace(tmp, meta_file)
+
+def save_stats_snapshot(df_completo, csv_file, snap_file, meta_file, corte=None):
+    meta = file_signature(csv_file, corte)
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        os.makedirs(os.path.dirname(snap_file), exist_ok=True)
+        tabela = pa.Table.from_pandas(df_completo, preserve_index=False)
+        embutido = json.dumps({**{c: meta[c] for c in CAMPOS_ASSINATURA}, "linhas": len(df_completo)})
+        tabela = tabela.replace_schema_metadata({**(tabela.schema.metadata or {}), CHAVE_META_PARQUET: embutido})
+        tmp = _tmp(snap_file)
+        pq.write_table(tabela, tmp)
+        os.replace(tmp, snap_file)
+        _gravar_meta(meta_file, meta)
+    except Exception as e:
+        # Sem permissão de escrita ou sem pyarrow: segue apenas com o DF em memória
+        print(f"Erro ao gravar snapshot {snap_file}: {e}")
+    return meta
+
+def _ler_snapshot(snap_file, meta):
+    # DF do snapshot, ou None se a assinatura gravada no Parquet não bater com o meta (arquivos de gravações diferentes)
+    import pyarrow.parquet as pq
+    with open(snap_file, 'rb') as f:
+        # Metadados e dados lidos do mesmo arquivo aberto, mesmo que outro processo troque o snapshot no meio
+        embutido = (pq.read_schema(f).metadata or {}).get(CHAVE_META_PARQUET)
+        if embutido is None:
+            return None
+        embutido = json.loads(embutido)
+        if any(embutido.get(c) != meta.get(c) for c in CAMPOS_ASSINATURA):
+            return None
+        f.seek(0)
+        df = pd.read_parquet(f)
+    return df if len(df) == embutido.get("linhas") else None
+
+def load_stats_frame(csv_file, cache_dir, base=None, corte=None):
+    # Carrega o DF principal reaproveitando o que já existe (DF em memória `base` ou snapshot Parquet):
+    # - CSV igual: devolve a base como está
+    # - CSV só com linhas anexadas: faz o parse apenas da cauda e junta à base
+    # - qualquer outra alteração (ou outro corte de datas): parse completo do CSV
+    # Retorna (df, meta, inicio), onde `inicio` é a posição da primeira linha nova (None = reconstrução completa)
+    nome = os.path.splitext(os.path.basename(csv_file))[0]
+    snap_file = os.path.join(cache_dir, f"{nome}.parquet")
+    meta_file = os.path.join(cache_dir, f"{nome}.meta.json")
+
+    if base is None and os.path.exists(snap_file) and os.path.exists(meta_file):
+        try:
+            with open(meta_file, encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get("schema") == SCHEMA_VERSION and meta.get("corte") == _corte_txt(corte):
+                df_snap = _ler_snapshot(snap_file, meta)
+                if df_snap is not None:
+                    base = (df_snap, meta)
+                else:
+                    print(f"{nome}: snapshot e meta de gravações diferentes, reconstruindo a partir do CSV")
+        except Exception as e:
+            print(f"Erro ao ler snapshot {snap_file}: {e}")
+
+    if base is not None and base[1].get("corte") != _corte_txt(corte):
+        base = None
+
+    if base is not None:
+        df_base, meta = base
+        stat = os.stat(csv_file)
+        # Caminho rápido: tamanho e mtime iguais -> base válida sem reler o CSV
+        if meta.get("size") == stat.st_size and meta.get("mtime") == stat.st_mtime_ns:
+            return df_base, meta, len(df_base)
+        if meta.get("size") == stat.st_size:
+            # mtime mudou (ex.: checkout/cópia) mas o conteúdo pode ser o mesmo: confere o hash
+            assinatura = file_signature(csv_file, corte)
+            if assinatura["md5"] == meta.get("md5"):
+                try:
+                    _gravar_meta(meta_file, assinatura)
+                except OSError as e:
+                    print(f"Erro ao gravar snapshot {meta_file}: {e}")
+                return df_base, assinatura, len(df_base)
+        elif is_append_only(csv_file, meta):
+            df_novo = parse_stats_tail(csv_file, meta["size"], corte)
+            df_completo = append_stats_rows(df_base, df_novo)
+            print(f"{nome}: {len(df_novo)} linhas novas incorporadas sem reprocessar o arquivo")
+            return df_completo, save_stats_snapshot(df_completo, csv_file, snap_file, meta_file, corte), len(df_base)
+
+    df_completo = parse_stats_csv(csv_file, corte)
+    return df_completo, save_stats_snapshot(df_completo, csv_file, snap_file, meta_file, corte), None
+
+def file_version(csv_file):
+    # Versão barata de um arquivo (tamanho + mtime), verificada a cada rerun
+    try:
+        stat = os.stat(csv_file)
+    except OSError:
+        return ""
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+def load_linhas(csv_linhas):
+    # Carrega DF de linhas
+    try:
+        df_linhas = pd.read_csv(csv_linhas, sep=None, engine='python', encoding='utf-8-sig')
+    except UnicodeDecodeError:
+        df_linhas = pd.read_csv(csv_linhas, sep=None, engine='python', encoding='latin1')
+    df_linhas.columns = [c.strip().lower() for c in df_linhas.columns]
+    return df_linhas
+
+def load_shared_linhas(csv_linhas, resolver, idx_jogador):
+    # linhas.csv com o nome de cada linha resolvido para a chave canônica do jogador (acentos, caixa, sufixos e
+    # apelidos); a partir daqui os lookups de linhas são joins exatos por chave
+    versao = file_version(csv_linhas)
+    df_linhas = load_linhas(csv_linhas)
+    chaves, nomes = resolve_linhas(df_linhas, resolver, idx_jogador)
+    df_linhas['chave_jogador'] = chaves
+    for problema, lista in nomes.items():
+        if lista:
+            print(f"linhas.csv: {len(lista)} nome(s) {problema.replace('_', ' ')}: {', '.join(lista)}")
+    hashes = linhas_row_hashes(df_linhas)
+    return SharedLinhas(df_linhas, nomes, versao, hashes, hash_linhas(df_linhas, hashes))
+
+def load_players_images(csv_jogadores):
+    # Carrega DF de jogadores/imagens
+    df_players_images = pd.read_csv(csv_jogadores, sep=None, engine='python', encoding='utf-8')
+    df_players_images.columns = [c.strip() for c in df_players_images.columns]
+    if 'Nome' in df_players_images.columns and 'Sobrenome' in df_players_images.columns:
+        df_players_images['Nome_Full'] = df_players_images['Nome'].astype(str).str.strip() + " " + df_players_images['Sobrenome'].astype(str).str.strip()
+    return df_players_images
+
+def load_dataset(base_dir, anterior=None, cache_dir=None, corte=None):
+    # Monta o SharedDataset a partir dos CSVs em `base_dir`.
+    # `anterior`: dataset carregado antes neste processo; se o CSV principal só recebeu linhas novas,
+    # o DF e os agregados são atualizados de forma incremental: índice de jogadores e resumo H2H/MMM só nos
+    # jogadores com jogos novos, cubo de defesa só nos oponentes deles e elencos só nas equipes deles.
+    # Ranks de recência, resolver de nomes, linhas.csv e fotos são sempre refeitos (passadas lineares baratas).
+    # `corte`: data mínima dos jogos mantidos em memória (ver stats_cutoff); None = histórico inteiro.
+    csv_file = os.path.join(base_dir, CSV_STATS)
+    csv_linhas = os.path.join(base_dir, CSV_LINHAS)
+    csv_jogadores = os.path.join(base_dir, CSV_JOGADORES)
+    cache_dir = cache_dir or os.path.join(base_dir, ".cache")
+
+    # Verifica se arquivos existem
+    faltando = [os.path.basename(p) for p in [csv_file, csv_linhas, csv_jogadores] if not os.path.exists(p)]
+    if faltando:
+        raise FileNotFoundError(f"Arquivos CSV não encontrados: {', '.join(faltando)}")
+
+    versao = file_version(csv_file)
+
+    # Carrega DF principal de forma incremental (DF anterior em memória ou snapshot Parquet + linhas anexadas)
+    # (sem os ranks de recência, que são recalculados abaixo e não entram no snapshot)
+    base = (anterior.stats.drop(columns=COLS_RANK, errors='ignore'), dict(anterior.meta)) if anterior is not None else None
+    df_completo, meta, inicio = load_stats_frame(csv_file, cache_dir, base, corte)
+
+    # Índice jogador -> linhas (ordenadas por data): atualizado só com as linhas novas quando possível
+    incremental = anterior is not None and inicio is not None
+    if incremental:
+        idx_jogador = update_player_index(anterior.idx_jogador, df_completo, inicio)
+    else:
+        idx_jogador = build_player_index(df_completo)
+
+    # Rank de recência por jogador e por jogador + local: janelas de últimos N sem ordenar por rerun
+    rank, rank_local = build_recency_ranks(df_completo, idx_jogador)
+    df_completo = df_completo.assign(Rank_Recente=rank, Rank_Local=rank_local)
+
+    _, total_mb, rss_mb = memory_report(df_completo)
+    print(f"DF principal: {len(df_completo)} linhas, {total_mb:.1f} MB" + (f" (jogos desde {corte:%d/%m/%Y})" if corte is not None else "")
+          + (f" | RSS do processo: {rss_mb:.0f} MB" if rss_mb else ""))
+
+    df_players_images = load_players_images(csv_jogadores)
+
+    # Resolver de nomes (montado uma vez por versão do CSV principal) e linhas.csv já resolvido
+    resolver = build_name_resolver(df_completo, idx_jogador)
+    linhas_data = load_shared_linhas(csv_linhas, resolver, idx_jogador)
+
+    # Cubo oponente x posição (Defensive Gaps e Média Cedida), resumo jogador x oponente x local (H2H e MMM)
+    # e elencos por minutos: no append, só os grupos tocados pelas linhas novas
+    if incremental:
+        defesa = update_defense_cube(anterior.defesa, df_completo, inicio)
+        resumo = update_matchup_summary(anterior.resumo, df_completo, idx_jogador, inicio)
+        rosters = update_team_rosters(anterior.rosters, df_completo, inicio)
+    else:
+        defesa = build_defense_cube(df_completo)
+        resumo = build_matchup_summary(df_completo)
+        rosters = build_team_rosters(df_completo)
+
+    # Listas de equipes / oponentes dos filtros
+    equipes, oponentes = sorted_teams(df_completo['Time_Full']), sorted_teams(df_completo['Opp_Full'])
+
+    # Índice nome -> foto (uma varredura de assets/players)
+    fotos = build_photo_index(df_players_images, base_dir)
+
+    return SharedDataset(df_completo, linhas_data, df_players_images, idx_jogador, defesa, resumo, rosters, equipes, oponentes,
+                         fotos, resolver, meta, versao)
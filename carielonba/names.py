@@ -0,0 +1,92 @@
+import re
+import unicodedata
+
+import pandas as pd
+
+from .constants import ABREV_PARA_FULL
+
+# Sufixos ignorados na comparação ("Tim Hardaway Jr." == "Tim Hardaway")
+SUFIXOS_NOME = {"jr", "sr", "ii", "iii", "iv", "v"}
+# Apelidos comuns -> primeiro nome completo (aplicado dos dois lados: "Cam Thomas" == "Cameron Thomas")
+APELIDOS_NOME = {"herb": "herbert", "cam": "cameron", "nic": "nicolas"}
+# Exceções de um jogador só (não viram regra para todos com o mesmo primeiro nome): nome normalizado -> nome completo
+ALIAS_JOGADOR = {"mo wagner": "moritz wagner"}
+
+_NAO_ALFANUM = re.compile(r"[^a-z0-9 ]+")
+
+def normalize_name(nome):
+    # Forma canônica para comparação: sem acentos, minúsculo, sem pontuação e sem sufixos (Jr., III...)
+    txt = unicodedata.normalize("NFKD", str(nome)).encode("ascii", "ignore").decode().lower()
+    partes = _NAO_ALFANUM.sub(" ", txt.replace("'", "").replace(".", "")).split()
+    while len(partes) > 1 and partes[-1] in SUFIXOS_NOME:
+        partes.pop()
+    return " ".join(partes)
+
+def _chave_busca(nome_norm):
+    # Nome normalizado com o apelido do primeiro nome expandido (ou o nome completo do alias do jogador)
+    if nome_norm in ALIAS_JOGADOR:
+        return ALIAS_JOGADOR[nome_norm]
+    partes = nome_norm.split()
+    if len(partes) > 1 and partes[0] in APELIDOS_NOME:
+        partes[0] = APELIDOS_NOME[partes[0]]
+    return " ".join(partes)
+
+def build_name_resolver(df, idx_jogador):
+    # Tabelas de lookup exato a partir do índice de jogadores (chave canônica = Nome_Full minúsculo):
+    # nome normalizado (com apelidos expandidos) -> chaves, "inicial + sobrenome" -> chaves e chave -> equipe do jogo mais recente
+    times = df['Time_Full'].astype(str).to_numpy()
+    por_nome, por_inicial, equipe = {}, {}, {}
+    for chave, pos in idx_jogador.items():
+        norm = normalize_name(chave)
+        por_nome.setdefault(_chave_busca(norm), []).append(chave)
+        partes = norm.split()
+        if len(partes) > 1:
+            por_inicial.setdefault(" ".join([partes[0][0]] + partes[1:]), []).append(chave)
+        if len(pos):
+            equipe[chave] = times[pos[0]]
+    return {"por_nome": por_nome, "por_inicial": por_inicial, "equipe": equipe}
+
+def resolve_player_name(resolver, idx_jogador, nome, equipe=None):
+    # Resolve um nome de linhas.csv para a chave canônica: (chave, None) ou (None, "nao_resolvido" | "ambiguo")
+    # Ordem: nome exato, nome normalizado (acentos, sufixos, apelidos), inicial + sobrenome; empates são desfeitos pela equipe
+    chave = str(nome).strip().lower()
+    if chave in idx_jogador:
+        return chave, None
+    norm = normalize_name(nome)
+    partes = norm.split()
+    candidatos = resolver["por_nome"].get(_chave_busca(norm), [])
+    if not candidatos and len(partes) > 1 and len(partes[0]) == 1:
+        # "D Barlow": inicial + sobrenome
+        candidatos = resolver["por_inicial"].get(norm, [])
+    if len(candidatos) > 1 and equipe:
+        mesma_equipe = [c for c in candidatos if resolver["equipe"].get(c) == equipe]
+        if mesma_equipe:
+            candidatos = mesma_equipe
+    if len(candidatos) == 1:
+        return candidatos[0], None
+    return None, ("ambiguo" if candidatos else "nao_resolvido")
+
+def resolve_linhas(df_linhas, resolver, idx_jogador):
+    # Chave canônica de cada linha de linhas.csv (None quando não resolvida) + relatório de nomes problemáticos
+    nomes = df_linhas['jogador'].astype(str).str.strip() if 'jogador' in df_linhas.columns else pd.Series("", index=df_linhas.index)
+    equipes = df_linhas['equipe'].astype(str).str.strip() if 'equipe' in df_linhas.columns else pd.Series("", index=df_linhas.index)
+    equipes = equipes.map(ABREV_PARA_FULL).fillna(equipes)
+
+    cache, chaves = {}, []
+    relatorio = {"nao_resolvido": set(), "ambiguo": set()}
+    for nome, equipe in zip(nomes, equipes):
+        if (nome, equipe) not in cache:
+            cache[(nome, equipe)] = resolve_player_name(resolver, idx_jogador, nome, equipe) if nome and nome.lower() != "nan" else (None, None)
+        chave, problema = cache[(nome, equipe)]
+        if problema:
+            relatorio[problema].add(nome)
+        chaves.append(chave)
+    return pd.Series(chaves, index=df_linhas.index, dtype=object), {k: tuple(sorted(v)) for k, v in relatorio.items()}
+
+def build_linhas_index(chaves):
+    # Chave canônica -> posição da primeira linha do jogador em linhas.csv (join exato, sem varrer o DF)
+    idx = {}
+    for pos, chave in enumerate(chaves):
+        if chave is not None:
+            idx.setdefault(chave, pos)
+    return idx
@@ -0,0 +1,98 @@
+import queue
+import threading
+from functools import partial
+
+from .analysis import analyze_selection, calc_piso_linhas, calc_tips
+
+PREFETCH_TOP_JOGADORES = 2  # Jogadores com mais minutos aquecidos por equipe (o clique abre o primeiro)
+
+
+class BackgroundPrefetcher:
+    # Uma thread daemon por processo consumindo uma fila de tarefas (chave, função), na ordem em que chegaram.
+    # Chaves que já estão na fila são ignoradas; a thread encerra sozinha depois de um tempo ociosa.
+    def __init__(self, ocioso_s=30):
+        self.ocioso_s = ocioso_s
+        self._fila = queue.Queue()
+        self._pendentes = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.executadas = 0
+        self.erros = 0
+
+    def submit(self, tarefas):
+        novas = 0
+        with self._lock:
+            for chave, fn in tarefas:
+                if chave in self._pendentes:
+                    continue
+                self._pendentes.add(chave)
+                self._fila.put((chave, fn))
+                novas += 1
+            if novas and self._thread is None:
+                self._thread = threading.Thread(target=self._rodar, name="carielonba-prefetch", daemon=True)
+                self._thread.start()
+        return novas
+
+    def _rodar(self):
+        while True:
+            try:
+                chave, fn = self._fila.get(timeout=self.ocioso_s)
+            except queue.Empty:
+                with self._lock:
+                    if self._fila.empty():
+                        self._thread = None
+                        return
+                continue
+            try:
+                fn()
+            except Exception as e:
+                self.erros += 1
+                print(f"Erro no prefetch de {chave}: {e}")
+            finally:
+                with self._lock:
+                    self._pendentes.discard(chave)
+                    self.executadas += 1
+
+    def pendentes(self):
+        with self._lock:
+            return len(self._pendentes)
+
+def matchup_selections(ds, schedule, top=PREFETCH_TOP_JOGADORES):
+    # (jogador, oponente, local) que um clique nos jogos da janela abre: os `top` jogadores com mais minutos
+    # de cada lado, contra o adversário do jogo, com o local do clique (mandante "Casa", visitante "Fora")
+    selecoes = []
+    for jogos in schedule.values():
+        for jogo in jogos:
+            for equipe, oponente, local in [(jogo['home'], jogo['away'], "Casa"), (jogo['away'], jogo['home'], "Fora")]:
+                for jogador in ds.rosters.get(equipe, ())[:top]:
+                    selecoes.append((jogador, oponente, local))
+    return selecoes
+
+def matchup_prefetch_tasks(cache, ds, schedule, periodo, top=PREFETCH_TOP_JOGADORES):
+    # Tarefas que preenchem o LRU de análises com as seleções dos jogos listados (mesma chave usada pelo app);
+    # seleções já em cache ficam de fora
+    tarefas = []
+    for jogador, oponente, local in matchup_selections(ds, schedule, top):
+        chave = (ds.versao, jogador, None, oponente, local, periodo)
+        if chave in cache:
+            continue
+        calcular = partial(analyze_selection, ds, jogador=jogador, oponente=oponente, local=local, periodo=periodo)
+        tarefas.append((chave, partial(cache.get_or_compute, chave, calcular, apenas_versao_atual=True)))
+    return tarefas
+
+def piso_cache_key(versao, linhas_hash, periodo):
+    # Chave dos quadros de Piso x Linhas / Tips no LRU de análises (versão do dataset primeiro, como as seleções)
+    return (versao, "quadros", linhas_hash, periodo)
+
+def _calc_quadros(ds, linhas, periodo):
+    df_piso = calc_piso_linhas(ds.stats, ds.idx_jogador, linhas, periodo)
+    return df_piso, calc_tips(df_piso)
+
+def piso_prefetch_tasks(cache, ds, linhas_data, periodo):
+    # Tarefa que calcula (Piso x Linhas, Tips) do período direto pelo motor headless e guarda no LRU;
+    # lista vazia se o quadro já estiver em cache
+    chave = piso_cache_key(ds.versao, linhas_data.hash, periodo)
+    if chave in cache:
+        return []
+    calcular = partial(_calc_quadros, ds, linhas_data.linhas, periodo)
+    return [(chave, partial(cache.get_or_compute, chave, calcular, apenas_versao_atual=True))]
@@ -0,0 +1,106 @@
+import numpy as np
+
+from .constants import DISTRIBUICAO_STAT, MEIA_VIDA_RECENCIA, DEGRAUS_ESCADA
+
+# Coeficientes da aproximação de erf de Abramowitz & Stegun 7.1.26 (erro absoluto < 1.5e-7), sem depender do SciPy
+_AS_P = 0.3275911
+_AS_A = (0.254829592, -0.284496736, 1.421413741, -1.453152027, 1.061405429)
+
+
+def _norm_sf(z):
+    # P(Z > z) da normal padrão
+    x = np.abs(z) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + _AS_P * x)
+    poli = t * (_AS_A[0] + t * (_AS_A[1] + t * (_AS_A[2] + t * (_AS_A[3] + t * _AS_A[4]))))
+    cauda = 0.5 * poli * np.exp(-x * x)
+    return np.where(z >= 0, cauda, 1.0 - cauda)
+
+def _poisson_sf(media, k):
+    # P(X > k) da Poisson, com k inteiro por grupo; soma os termos 0..k de todos os grupos de uma vez.
+    # Acima de média + 20 desvios (+ 20) a cauda é zero em precisão double: k é limitado ali, então o laço
+    # depende só das médias da janela, nunca do tamanho da linha digitada
+    limite = np.ceil(media + 20.0 * np.sqrt(media) + 20.0)
+    alem = k > limite
+    k = np.minimum(k, limite).astype(int)
+    termo = np.exp(-media)
+    cdf = np.zeros_like(media)
+    for i in range(int(k.max(initial=-1)) + 1):
+        cdf += np.where(i <= k, termo, 0.0)
+        termo = termo * media / (i + 1)
+    return np.where(alem, 0.0, np.clip(1.0 - cdf, 0.0, 1.0))
+
+def hit_probabilities(valores, tamanhos, linhas, dist="normal", meia_vida=MEIA_VIDA_RECENCIA):
+    # P(stat > linha) para vários grupos (jogador + linha) de uma vez. `valores`: jogos de todos os grupos
+    # concatenados, cada grupo do mais recente para o mais antigo; `tamanhos`: jogos por grupo.
+    # Devolve (empírica, ajuste Poisson/normal, empírica ponderada pela recência), em 0..1;
+    # NaN nos grupos sem jogos ou sem linha válida (finita e > 0).
+    valores = np.asarray(valores, dtype=float)
+    tamanhos = np.asarray(tamanhos, dtype=int)
+    linhas = np.asarray(linhas, dtype=float)
+    validos = (tamanhos > 0) & np.isfinite(linhas) & (linhas > 0)
+    p_emp, p_fit, p_rec = (np.full(len(tamanhos), np.nan) for _ in range(3))
+    if not validos.any():
+        return p_emp, p_fit, p_rec
+
+    inicio = np.concatenate(([0], np.cumsum(tamanhos)[:-1]))
+    # Stats são contagens: "acima da linha" (ex.: 22.5 ou 22) é >= piso(linha) + 1
+    k = np.floor(np.where(validos, linhas, 0.0))
+    acima = valores > np.repeat(linhas, tamanhos)
+    # Peso de cada jogo pela posição no grupo (0 = mais recente), lido de uma tabela em vez de potência por jogo
+    pos_grupo = np.arange(len(valores)) - np.repeat(inicio, tamanhos)
+    peso = (0.5 ** (np.arange(tamanhos.max()) / meia_vida))[pos_grupo]
+
+    # reduceat sobre os grupos não vazios (blocos contíguos de `valores`), depois só os grupos com linha válida
+    nao_vazios = np.flatnonzero(tamanhos > 0)
+    ini = inicio[nao_vazios]
+    sel = validos[nao_vazios]
+    grupos = nao_vazios[sel]
+    n = tamanhos[grupos].astype(float)
+    media = np.add.reduceat(valores, ini)[sel] / n
+    p_emp[grupos] = np.add.reduceat(acima, ini)[sel] / n
+    p_rec[grupos] = np.add.reduceat(peso * acima, ini)[sel] / np.add.reduceat(peso, ini)[sel]
+
+    if dist == "poisson":
+        p_fit[grupos] = _poisson_sf(media, k[grupos])
+    else:
+        # Normal com correção de continuidade; desvio amostral (grupos de 1 jogo ou sem variação: degenerada na média)
+        soma_q = np.add.reduceat(valores * valores, ini)[sel]
+        desvio = np.sqrt(np.maximum(soma_q - n * media * media, 0.0) / np.maximum(n - 1, 1.0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = np.clip(np.nan_to_num((k[grupos] + 0.5 - media) / desvio), -40, 40)
+        p_fit[grupos] = np.where(desvio > 1e-9, _norm_sf(z), (media > k[grupos] + 0.5).astype(float))
+    return p_emp, p_fit, p_rec
+
+def stat_probabilities(serie, linha, coluna):
+    # Probabilidades de um jogador para uma linha (jogos do mais recente para o mais antigo), em %;
+    # distribuição do ajuste conforme a stat (DISTRIBUICAO_STAT)
+    p_emp, p_fit, p_rec = hit_probabilities(serie.to_numpy(dtype=float), [len(serie)], [linha], DISTRIBUICAO_STAT.get(coluna, "normal"))
+    return p_emp[0] * 100, p_fit[0] * 100, p_rec[0] * 100
+
+# --- Escada de Linhas (busca binária em arrays ordenados) ---
+def sorted_stats(df, colunas):
+    # Valores de cada stat em ordem crescente (sem NaN, somente leitura) + total de jogos da janela:
+    # calculados uma vez por seleção, servem qualquer quantidade de linhas por busca binária
+    ordenados = {}
+    for col in colunas:
+        if col in df.columns:
+            valores = np.sort(df[col].to_numpy(dtype=float))
+            valores = valores[:np.count_nonzero(~np.isnan(valores))]
+            valores.flags.writeable = False
+            ordenados[col] = valores
+    return {"n": len(df), "stats": ordenados}
+
+def ladder_hit_rates(ordenado, n, limiares):
+    # (% acima, % abaixo, % exatamente na linha) de cada limiar, sobre os n jogos da janela
+    limiares = np.asarray(limiares, dtype=float)
+    acima = len(ordenado) - np.searchsorted(ordenado, limiares, side='right')
+    abaixo = np.searchsorted(ordenado, limiares, side='left')
+    if n == 0:
+        vazio = np.zeros(len(limiares))
+        return vazio, vazio, vazio
+    return acima / n * 100, abaixo / n * 100, (len(ordenado) - acima - abaixo) / n * 100
+
+def ladder_thresholds(linha, passo, degraus=DEGRAUS_ESCADA):
+    # Linha principal +/- `degraus` passos (só valores positivos)
+    limiares = linha + passo * np.arange(-degraus, degraus + 1)
+    return limiares[limiares > 0]
@@ -0,0 +1,95 @@
+import os
+from datetime import timedelta
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+
+from .constants import CSV_JOGOS
+
+
+# --- Calendário da Temporada (jogos.csv) ---
+def find_schedule_file(base_dir):
+    file_path = os.path.join(base_dir, CSV_JOGOS)
+    
+    # Correção para Linux/Github: Procura o arquivo ignorando maiúsculas/minúsculas
+    if not os.path.exists(file_path):
+        for f in os.listdir(base_dir):
+            if f.lower() == CSV_JOGOS:
+                return os.path.join(base_dir, f)
+        return None
+    return file_path
+
+def parse_season_schedule(file_path, base_dir):
+    # Temporada inteira em um DF ordenado por data (o índice de datas), com status e logos já resolvidos
+    # Detecta o separador pelo cabeçalho para ler o arquivo uma única vez
+    with open(file_path, encoding='utf-8') as f:
+        cabecalho = f.readline()
+    sep = ';' if cabecalho.count(';') >= cabecalho.count(',') else ','
+    df = pd.read_csv(file_path, sep=sep, encoding='utf-8')
+    
+    # Normaliza colunas para minúsculo e remove espaços
+    df.columns = [c.strip().lower() for c in df.columns]
+
+    # Converte data (Formato explícito: dd/mm/yyyy hh:mm) e remove linhas com datas inválidas (NaT)
+    df['data_partida'] = pd.to_datetime(df['data_partida'].astype(str).str.strip(), format='%d/%m/%Y %H:%M', errors='coerce')
+    df = df.dropna(subset=['data_partida']).sort_values(by='data_partida', kind='mergesort')
+
+    home = df['equipe_casa'].fillna('').astype(str).str.strip() if 'equipe_casa' in df.columns else pd.Series('', index=df.index)
+    away = df['equipe_fora'].fillna('').astype(str).str.strip() if 'equipe_fora' in df.columns else pd.Series('', index=df.index)
+    game_id = home + "-" + away
+    if 'gameid' in df.columns:
+        game_id = df['gameid'].astype(object).where(df['gameid'].notna(), game_id)
+
+    # Logos: uma única listagem de assets/teams; o logo usa o último nome do time (ex: "Chicago Bulls" -> "bulls")
+    dir_teams = os.path.join(base_dir, "assets", "teams")
+    logos = set(os.listdir(dir_teams)) if os.path.isdir(dir_teams) else set()
+    def logo_path(nomes):
+        arquivo = nomes.str.split().str[-1].fillna('').str.lower() + ".png"
+        return arquivo.map(lambda a: os.path.join(dir_teams, a) if a in logos else None)
+
+    # Status (Horário ou VS)
+    datas = df['data_partida']
+    tem_horario = (datas.dt.hour != 0) | (datas.dt.minute != 0)
+    status = datas.dt.strftime('%H:%M').where(tem_horario, "VS")
+
+    return pd.DataFrame({
+        "data": datas.to_numpy(),
+        "data_lbl": datas.dt.strftime('%d/%m/%Y').to_numpy(),
+        "id": game_id.to_numpy(),
+        "home": home.to_numpy(),
+        "away": away.to_numpy(),
+        "status": status.to_numpy(),
+        "home_logo": logo_path(home).to_numpy(),
+        "away_logo": logo_path(away).to_numpy(),
+    })
+
+def schedule_window(temporada, inicio, dias=7):
+    # Janela [inicio, inicio + dias) como fatia do índice de datas da temporada (busca binária, sem varrer linhas)
+    if temporada is None or temporada.empty:
+        return MappingProxyType({})
+    datas = temporada['data'].to_numpy()
+    i0, i1 = np.searchsorted(datas, np.datetime64(inicio), side='left'), np.searchsorted(datas, np.datetime64(inicio + timedelta(days=dias)), side='left')
+    janela = temporada.iloc[i0:i1]
+
+    schedule = {}
+    for jogo in janela.drop(columns=['data']).to_dict('records'):
+        schedule.setdefault(jogo.pop('data_lbl'), []).append(MappingProxyType(jogo))
+    # Compartilhado entre sessões: somente leitura
+    return MappingProxyType({d: tuple(jogos) for d, jogos in schedule.items()})
+
+# --- Grade Compacta de Próximos Jogos ---
+# Colunas da grade de um dia e o lado (Casa / Fora) que um clique em cada uma abre na análise
+COLS_GRADE_AGENDA = ["Logo Casa", "Casa", "Horário", "Fora", "Logo Fora"]
+LADO_GRADE_AGENDA = {"Logo Casa": "Casa", "Casa": "Casa", "Logo Fora": "Fora", "Fora": "Fora"}
+
+def schedule_day_grid(jogos, logo_uri):
+    # Jogos de um dia em uma única tabela (um elemento na página em vez de containers, colunas e botões por jogo);
+    # `logo_uri`: caminho do logo -> data URI da miniatura, cacheada pelo chamador
+    return pd.DataFrame({
+        "Logo Casa": [logo_uri(j['home_logo']) if j['home_logo'] else None for j in jogos],
+        "Casa": [j['home'] for j in jogos],
+        "Horário": [j['status'] for j in jogos],
+        "Fora": [j['away'] for j in jogos],
+        "Logo Fora": [logo_uri(j['away_logo']) if j['away_logo'] else None for j in jogos],
+    }, columns=COLS_GRADE_AGENDA)
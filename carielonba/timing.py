@@ -0,0 +1,80 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+TIMING_LOG_MAX_BYTES = 5_000_000  # Ao passar do limite, o log atual vira <arquivo>.1 e um novo é iniciado
+
+
+class RerunTimer:
+    # Spans de tempo das etapas de um rerun (ms), na ordem em que rodaram.
+    # Etapas com o mesmo nome (ex.: chamadas em loop) são somadas.
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.etapas = {}
+
+    @contextmanager
+    def span(self, nome):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.etapas[nome] = self.etapas.get(nome, 0.0) + (time.perf_counter() - t0) * 1000
+
+    def total_ms(self):
+        return (time.perf_counter() - self.inicio) * 1000
+
+    def registro(self, **contexto):
+        # Linha estruturada do rerun: horário, contexto (página, período...), total e tempo por etapa
+        return {
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            **contexto,
+            "total_ms": round(self.total_ms(), 2),
+            "stages": {nome: round(ms, 2) for nome, ms in self.etapas.items()},
+        }
+
+def write_timing_log(path, registro):
+    # Acrescenta o registro como uma linha JSON; "-" escreve no stdout (logs do servidor)
+    linha = json.dumps(registro, ensure_ascii=False)
+    if path == "-":
+        print(linha, flush=True)
+        return
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if os.path.exists(path) and os.path.getsize(path) > TIMING_LOG_MAX_BYTES:
+            os.replace(path, path + ".1")
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(linha + "\n")
+    except OSError as e:
+        print(f"Erro ao gravar log de tempos: {e}")
+
+def summarize_timing_log(path, ultimos=None):
+    # p50 / p95 / máximo (ms) por etapa a partir do log JSON lines (opcionalmente só os últimos N reruns)
+    registros = []
+    try:
+        with open(path, encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    registros.append(json.loads(linha))
+                except ValueError:
+                    continue
+    except OSError:
+        return pd.DataFrame()
+    if ultimos:
+        registros = registros[-ultimos:]
+
+    por_etapa = {}
+    for r in registros:
+        por_etapa.setdefault("total", []).append(r.get("total_ms", 0.0))
+        for nome, ms in r.get("stages", {}).items():
+            por_etapa.setdefault(nome, []).append(ms)
+    if not por_etapa:
+        return pd.DataFrame()
+    return pd.DataFrame([
+        {"Etapa": nome, "N": len(v), "p50 ms": np.percentile(v, 50), "p95 ms": np.percentile(v, 95), "máx ms": max(v)}
+        for nome, v in por_etapa.items()
+    ])
@@ -0,0 +1,198 @@
+# Aquecimento do app antes de aceitar tráfego: carrega o dataset (índices, ranks, cubo de defesa, resumo H2H/MMM
+# e snapshot Parquet), gera os quadros de Piso x Linhas / Tips de todos os períodos (batch) e lê a agenda da temporada,
+# registrando o tempo de cada etapa.
+#
+# Com --serve o aquecimento roda no mesmo processo do streamlit: o app recebe o dataset e a agenda já prontos
+# (take_warmed) e o arquivo de prontidão (um por porta: .cache/ready-<porta>.json) só é gravado quando o servidor
+# responde ao /_stcore/health. Sem --serve só os caches em disco são aquecidos e a prontidão não é tocada
+# (pode rodar por cron ao lado de um servidor no ar).
+# O health check do balanceador usa `--check`: sai com 0 só se o arquivo existir, o pid gravado estiver vivo e o
+# /_stcore/health responder (um arquivo que sobrou de um processo morto por SIGKILL/OOM não passa).
+#
+# Uso: python -m carielonba.warmup [--base-dir .] [--corte 3]                # só os caches em disco (snapshot + batch)
+#      python -m carielonba.warmup --serve [-- --server.port 8501]           # aquece e sobe o streamlit no mesmo processo
+#      python -m carielonba.warmup --check [-- --server.port 8501]           # health check da instância nessa porta
+import argparse
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+
+from .constants import CSV_STATS
+from .loader import load_dataset, file_version, stats_cutoff
+from .schedule import find_schedule_file, parse_season_schedule
+from .batch import run_batch
+from .timing import RerunTimer, write_timing_log
+
+RAIZ_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT_APP = "carielonba_web.py"
+READY_FILE = "ready-{porta}.json"
+HEALTH_TIMEOUT_S = 120  # Espera máxima pelo servidor no --serve antes de desistir de marcar prontidão
+
+# Objetos aquecidos neste processo: nome -> (versão dos arquivos, objeto); o app retira cada um uma vez
+_aquecidos = {}
+_lock = threading.Lock()
+
+def take_warmed(nome, versao):
+    # Objeto pré-carregado pelo aquecimento se ainda for da mesma versão dos arquivos (None se não houver)
+    with _lock:
+        item = _aquecidos.pop(nome, None)
+    return item[1] if item is not None and item[0] == versao else None
+
+# --- Arquivo de Prontidão ---
+def ready_file_path(base_dir, porta):
+    # Um arquivo por instância (porta do servidor): réplicas com a mesma pasta base não se sobrescrevem
+    return os.environ.get("CARIELONBA_READY_FILE") or os.path.join(base_dir, ".cache", READY_FILE.format(porta=porta))
+
+def clear_ready(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"Erro ao remover arquivo de prontidão: {e}")
+
+def mark_ready(path, registro):
+    # Grava em arquivo temporário e troca no fim: o health check nunca lê um arquivo pela metade
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"ready": True, "pid": os.getpid(), **registro}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Erro ao gravar arquivo de prontidão: {e}")
+
+def read_ready(path):
+    # Conteúdo do arquivo de prontidão, ou None se o app não estiver pronto
+    try:
+        with open(path, encoding="utf-8") as f:
+            estado = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return estado if estado.get("ready") else None
+
+def _pid_vivo(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except (OSError, TypeError, ValueError):
+        return False
+    return True
+
+def check_ready(path):
+    # Prontidão confirmada: arquivo gravado, processo que o gravou ainda vivo e servidor respondendo ao health check
+    estado = read_ready(path)
+    if estado is None or not _pid_vivo(estado.get("pid")):
+        return None
+    try:
+        with urllib.request.urlopen(estado["health_url"], timeout=2) as resposta:
+            return estado if resposta.status == 200 else None
+    except Exception:
+        return None
+
+def _porta(args_streamlit):
+    # Porta do servidor: --server.port dos argumentos do streamlit, senão STREAMLIT_SERVER_PORT / config.toml
+    for i, arg in enumerate(args_streamlit):
+        if arg.startswith("--server.port="):
+            return int(arg.split("=", 1)[1])
+        if arg == "--server.port" and i + 1 < len(args_streamlit):
+            return int(args_streamlit[i + 1])
+    if os.environ.get("STREAMLIT_SERVER_PORT"):
+        return int(os.environ["STREAMLIT_SERVER_PORT"])
+    from streamlit import config
+    return config.get_option("server.port")
+
+# --- Aquecimento ---
+def warm_up(base_dir, cache_dir=None, out_dir=None, corte=None, workers=None):
+    # Monta tudo o que a primeira sessão pagaria; devolve (dataset, agenda, registro de tempos)
+    cache_dir = cache_dir or os.path.join(base_dir, ".cache")
+    out_dir = out_dir or os.path.join(cache_dir, "batch")
+    timer = RerunTimer()
+
+    with timer.span("load_dataset"):
+        dataset = load_dataset(base_dir, cache_dir=cache_dir, corte=corte)
+    with timer.span("batch_piso_tips"):
+        run_batch(base_dir, out_dir, workers, cache_dir=cache_dir, corte=corte, dataset=dataset)
+    with timer.span("schedule"):
+        arquivo_agenda = find_schedule_file(base_dir)
+        agenda = parse_season_schedule(arquivo_agenda, base_dir) if arquivo_agenda else None
+
+    with _lock:
+        _aquecidos["dataset"] = ((file_version(os.path.join(base_dir, CSV_STATS)), corte), dataset)
+        if agenda is not None:
+            _aquecidos["agenda"] = (file_version(arquivo_agenda), agenda)
+
+    registro = timer.registro(pagina="aquecimento", pid=os.getpid(), linhas_stats=len(dataset.stats),
+                              jogos_agenda=len(agenda) if agenda is not None else 0)
+    return dataset, agenda, registro
+
+def _marcar_quando_no_ar(ready_file, registro):
+    # Thread do --serve: marca prontidão quando o servidor responde ao health check do próprio streamlit
+    from streamlit import config
+    limite = time.monotonic() + HEALTH_TIMEOUT_S
+    while time.monotonic() < limite:
+        time.sleep(0.5)
+        try:
+            base_url = config.get_option("server.baseUrlPath").strip("/")
+            url = f"http://localhost:{config.get_option('server.port')}/{base_url + '/' if base_url else ''}_stcore/health"
+            with urllib.request.urlopen(url, timeout=2) as resposta:
+                if resposta.status == 200:
+                    mark_ready(ready_file, {**registro, "health_url": url})
+                    print(f"App pronto ({ready_file})", flush=True)
+                    return
+        except Exception:
+            continue
+    print(f"Erro no aquecimento: servidor não respondeu ao health check em {HEALTH_TIMEOUT_S}s")
+
+def _serve(base_dir, ready_file, registro, args_streamlit):
+    # Sobe o streamlit neste processo (os caches aquecidos ficam disponíveis para o app)
+    from streamlit.web import cli as stcli
+    atexit.register(clear_ready, ready_file)
+    threading.Thread(target=_marcar_quando_no_ar, args=(ready_file, registro), name="carielonba-ready", daemon=True).start()
+    sys.argv = ["streamlit", "run", os.path.join(base_dir, SCRIPT_APP)] + args_streamlit
+    sys.exit(stcli.main())
+
+def main():
+    parser = argparse.ArgumentParser(description="Aquece os caches do Carielo NBA antes de aceitar tráfego.")
+    parser.add_argument("--base-dir", default=RAIZ_APP, help="Pasta com os CSVs e o carielonba_web.py (padrão: a do app)")
+    parser.add_argument("--out", help="Pasta do batch de Piso/Tips (padrão: CARIELONBA_BATCH_DIR ou <base-dir>/.cache/batch)")
+    parser.add_argument("--workers", type=int, help="Processos worker do batch")
+    parser.add_argument("--corte", default=os.environ.get("CARIELONBA_CORTE", ""),
+                        help="Data mínima dos jogos (AAAA-MM-DD) ou número de temporadas; padrão: CARIELONBA_CORTE, como no app")
+    parser.add_argument("--log", default=os.environ.get("CARIELONBA_WARMUP_LOG"),
+                        help="Log JSON lines com os tempos do aquecimento (\"-\" = stdout; padrão: <base-dir>/.cache/warmup.jsonl)")
+    parser.add_argument("--serve", action="store_true", help="Depois de aquecer, sobe o streamlit neste processo")
+    parser.add_argument("--check", action="store_true", help="Health check: sai com 0 se o app estiver pronto, 1 se não")
+    args, args_streamlit = parser.parse_known_args()
+    args_streamlit = [a for a in args_streamlit if a != "--"]
+
+    base_dir = os.path.abspath(args.base_dir)
+    ready_file = ready_file_path(base_dir, _porta(args_streamlit))
+    if args.check:
+        estado = check_ready(ready_file)
+        print(f"pronto desde {estado['ts']} (aquecimento {estado['total_ms'] / 1000:.1f}s)" if estado else "não pronto")
+        sys.exit(0 if estado else 1)
+
+    if args.serve:
+        # Só a instância que vai servir responde pela própria prontidão
+        clear_ready(ready_file)
+    out_dir = args.out or os.environ.get("CARIELONBA_BATCH_DIR") or os.path.join(base_dir, ".cache", "batch")
+    _, _, registro = warm_up(base_dir, out_dir=out_dir, corte=stats_cutoff(args.corte), workers=args.workers)
+    write_timing_log(args.log or os.path.join(base_dir, ".cache", "warmup.jsonl"), registro)
+    etapas = " | ".join(f"{nome} {ms / 1000:.2f}s" for nome, ms in registro["stages"].items())
+    print(f"Aquecimento concluído em {registro['total_ms'] / 1000:.1f}s ({etapas})", flush=True)
+
+    if args.serve:
+        _serve(base_dir, ready_file, registro, args_streamlit)
+
+if __name__ == "__main__":
+    # Executado com -m: usa o módulo importado (carielonba.warmup), onde o app procura os objetos aquecidos
+    from carielonba.warmup import main as _main
+    _main()
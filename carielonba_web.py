@@ -1,9 +1,24 @@
 import streamlit as st
 import pandas as pd
 import os
-from PIL import Image
+from types import MappingProxyType
 from datetime import datetime, timedelta
 
+# Núcleo de análise (sem Streamlit): carregamento, índices, cubo de defesa e motor de Piso/Tips
+from carielonba import (
+    CSV_STATS, CSV_LINHAS, LOCAIS, JANELA_MIN, JANELA_MAX, PERIODO_TEMPORADA, MERCADOS_ESCADA,
+    load_dataset, load_shared_linhas, stats_cutoff, file_version, find_schedule_file, parse_season_schedule, schedule_window, make_thumbnail,
+    schedule_day_grid, png_data_uri, LADO_GRADE_AGENDA,
+    periodo_label, analyze_selection, AnalysisLRU, BackgroundPrefetcher, matchup_prefetch_tasks, piso_cache_key, piso_prefetch_tasks,
+    linha_do_jogador, projecao_vs_linha, parse_alt_lines, alt_line_ladder, update_piso_linhas, calc_tips,
+    RerunTimer, write_timing_log, summarize_timing_log,
+)
+from carielonba.batch import load_batch_tables, has_batch_tables
+from carielonba.warmup import take_warmed, ready_file_path, read_ready
+
+# Tempos por etapa deste rerun (painel de debug com ?debug=1 e log JSON lines no fim do script)
+timer = RerunTimer()
+
 st.markdown("""
 <style>
 /* Esconde header superior */
@@ -241,160 +256,157 @@ st.markdown(f"""
     </style>
 """, unsafe_allow_html=True)
 
-# --- Dicionários e Constantes ---
-TIME_PARA_FULL = {
-    "76ers": "Philadelphia 76ers", "Bucks": "Milwaukee Bucks", "Bulls": "Chicago Bulls",
-    "Cavaliers": "Cleveland Cavaliers", "Celtics": "Boston Celtics", "Clippers": "Los Angeles Clippers",
-    "Grizzlies": "Memphis Grizzlies", "Hawks": "Atlanta Hawks", "Heat": "Miami Heat",
-    "Hornets": "Charlotte Hornets", "Jazz": "Utah Jazz", "Kings": "Sacramento Kings",
-    "Knicks": "New York Knicks", "Lakers": "Los Angeles Lakers", "Magic": "Orlando Magic",
-    "Mavericks": "Dallas Mavericks", "Nets": "Brooklyn Nets", "Nuggets": "Denver Nuggets",
-    "Pacers": "Indiana Pacers", "Pelicans": "New Orleans Pelicans", "Pistons": "Detroit Pistons",
-    "Raptors": "Toronto Raptors", "Rockets": "Houston Rockets", "Spurs": "San Antonio Spurs",
-    "Suns": "Phoenix Suns", "Thunder": "Oklahoma City Thunder", "Timberwolves": "Minnesota Timberwolves",
-    "Trail Blazers": "Portland Trail Blazers", "Warriors": "Golden State Warriors", "Wizards": "Washington Wizards",
-}
-ABREV_PARA_FULL = {
-    "ATL": "Atlanta Hawks", "BOS": "Boston Celtics", "BKN": "Brooklyn Nets", "CHA": "Charlotte Hornets",
-    "CHI": "Chicago Bulls", "CLE": "Cleveland Cavaliers", "DAL": "Dallas Mavericks", "DEN": "Denver Nuggets",
-    "DET": "Detroit Pistons", "GSW": "Golden State Warriors", "HOU": "Houston Rockets", "IND": "Indiana Pacers",
-    "LAC": "Los Angeles Clippers", "LAL": "Los Angeles Lakers", "MEM": "Memphis Grizzlies", "MIA": "Miami Heat",
-    "MIL": "Milwaukee Bucks", "MIN": "Minnesota Timberwolves", "NOP": "New Orleans Pelicans", "NYK": "New York Knicks",
-    "OKC": "Oklahoma City Thunder", "ORL": "Orlando Magic", "PHI": "Philadelphia 76ers", "PHX": "Phoenix Suns",
-    "POR": "Portland Trail Blazers", "SAC": "Sacramento Kings", "SAS": "San Antonio Spurs", "TOR": "Toronto Raptors",
-    "UTA": "Utah Jazz", "WAS": "Washington Wizards",
-}
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Log JSON lines dos tempos por rerun: caminho do arquivo, "-" para o stdout ou vazio para desligar
+TIMING_LOG = os.environ.get("CARIELONBA_TIMING_LOG", os.path.join(BASE_DIR, ".cache", "timings.jsonl"))
+
+# Saída do batch offline (python -m carielonba.batch), usada no lugar do cálculo ao vivo quando está em dia
+BATCH_DIR = os.environ.get("CARIELONBA_BATCH_DIR", os.path.join(BASE_DIR, ".cache", "batch"))
+# Corte do histórico mantido em memória: data (AAAA-MM-DD) ou número de temporadas (CARIELONBA_CORTE=3); vazio = tudo
+@st.cache_resource(show_spinner=False)
+def _corte_stats(valor):
+    # Interpretado uma vez por processo: um valor inválido avisa no log uma vez só (e segue sem corte)
+    return stats_cutoff(valor)
+
+CORTE_STATS = _corte_stats(os.environ.get("CARIELONBA_CORTE", ""))
+# Aquecimento em segundo plano das análises dos jogos em Próximos Jogos (CARIELONBA_PREFETCH=0 desliga)
+PREFETCH_ATIVO = os.environ.get("CARIELONBA_PREFETCH", "1") != "0"
+# Próximos Jogos em grade compacta (uma tabela por dia) por padrão; CARIELONBA_AGENDA_COMPACTA=0 volta aos cards por jogo
+AGENDA_COMPACTA = os.environ.get("CARIELONBA_AGENDA_COMPACTA", "1") != "0"
+
+# --- Miniaturas (cache do processo) ---
+THUMB_CACHE_MAX = 600  # Miniaturas mantidas em memória (jogadores + logos); as menos usadas saem primeiro
+
+@st.cache_resource(max_entries=THUMB_CACHE_MAX, show_spinner=False)
+def get_thumbnail(path, lado):
+    # PNG reduzido e já codificado, reaproveitado por todas as sessões
+    return make_thumbnail(path, lado)
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def get_logo_uri(path):
+    # Logo do time como data URI para as grades de Próximos Jogos: a mesma miniatura de 80 px dos cards
+    # (exibida com até 40 px, 2x para telas retina)
+    return png_data_uri(get_thumbnail(path, 80))
+
+# --- Resultados por Seleção (LRU do processo) ---
+@st.cache_resource
+def _analysis_cache():
+    # Compartilhado por todas as sessões; limite de memória em CARIELONBA_ANALYSIS_CACHE_MB (padrão 64 MB)
+    return AnalysisLRU(max_mb=float(os.environ.get("CARIELONBA_ANALYSIS_CACHE_MB", 64)))
+
+@st.cache_resource
+def _prefetcher():
+    # Thread de aquecimento do processo: análises dos confrontos listados em Próximos Jogos e quadros de Piso/Tips,
+    # calculadas pelo núcleo headless direto no LRU (sem chamar funções com cache do Streamlit fora do script)
+    return BackgroundPrefetcher()
 
 # --- Funções de Carregamento de Dados (com cache) ---
-@st.cache_data
-def load_all_data():
-    path_base = os.path.dirname(os.path.abspath(__file__))
-    
-    # Caminhos dos arquivos
-    csv_file = os.path.join(path_base, "PlayerStatistics_Clean.csv")
-    csv_linhas = os.path.join(path_base, "linhas.csv")
-    csv_jogadores = os.path.join(path_base, "jogadoresnba.csv")
-
-    # Verifica se arquivos existem
-    if not all(os.path.exists(p) for p in [csv_file, csv_linhas, csv_jogadores]):
-        st.error("Arquivos CSV não encontrados! Verifique se 'PlayerStatistics_Clean.csv', 'linhas.csv' e 'jogadoresnba.csv' estão na pasta do app.")
-        return None, None, None
-
-    # Carrega DF principal
-    df_completo = pd.read_csv(csv_file, sep=';', engine='python', encoding='utf-8-sig')
-    df_completo.columns = [c.strip() for c in df_completo.columns]
-    df_completo['Data_Hora_Jogo'] = pd.to_datetime(df_completo['Data_Hora_Jogo'], dayfirst=True, errors='coerce')
-    df_completo['Data_Limpa'] = df_completo['Data_Hora_Jogo'].dt.strftime('%d/%m/%Y')
-    df_completo['Time_Full'] = df_completo['Nome_Time'].astype(str).map(TIME_PARA_FULL).fillna(df_completo['Nome_Time'].astype(str))
-    df_completo['Opp_Full'] = df_completo['Nome_Oponente'].astype(str).map(TIME_PARA_FULL).fillna(df_completo['Nome_Oponente'].astype(str))
-    df_completo['Nome_Full'] = df_completo['Nome'].astype(str).str.strip() + " " + df_completo['Sobrenome'].astype(str).str.strip()
-
-    # Carrega DF de linhas
-    try:
-        df_linhas = pd.read_csv(csv_linhas, sep=None, engine='python', encoding='utf-8-sig')
-    except UnicodeDecodeError:
-        df_linhas = pd.read_csv(csv_linhas, sep=None, engine='python', encoding='latin1')
-    df_linhas.columns = [c.strip().lower() for c in df_linhas.columns]
-
-    # Carrega DF de jogadores/imagens
-    df_players_images = pd.read_csv(csv_jogadores, sep=None, engine='python', encoding='utf-8')
-    df_players_images.columns = [c.strip() for c in df_players_images.columns]
-    if 'Nome' in df_players_images.columns and 'Sobrenome' in df_players_images.columns:
-        df_players_images['Nome_Full'] = df_players_images['Nome'].astype(str).str.strip() + " " + df_players_images['Sobrenome'].astype(str).str.strip()
-
-    return df_completo, df_linhas, df_players_images
+@st.cache_resource
+def _dataset_store():
+    # Último dataset carregado neste processo, base para a ingestão incremental do CSV principal
+    return {}
+
+@st.cache_resource(max_entries=1)
+def load_all_data(versao_stats):
+    store = _dataset_store()
+    # Subindo com `python -m carielonba.warmup --serve`, o dataset já foi montado antes do servidor aceitar tráfego
+    dataset = take_warmed("dataset", (versao_stats, CORTE_STATS))
+    if dataset is None:
+        try:
+            dataset = load_dataset(BASE_DIR, anterior=store.get("dataset"), corte=CORTE_STATS)
+        except FileNotFoundError:
+            st.error("Arquivos CSV não encontrados! Verifique se 'PlayerStatistics_Clean.csv', 'linhas.csv' e 'jogadoresnba.csv' estão na pasta do app.")
+            return None
+    store["dataset"] = dataset
+    return dataset
+
+@st.cache_resource
+def _linhas_store():
+    # Última versão válida de linhas.csv (usada se o arquivo estiver no meio de uma gravação)
+    return {}
+
+@st.cache_resource(max_entries=1)
+def load_linhas_data(versao_stats, versao_linhas, _dataset):
+    # linhas.csv tem cache próprio, verificado a cada rerun pela versão do arquivo: quando só as linhas mudam,
+    # são recarregadas e resolvidas com o resolver do dataset atual, sem recarregar o CSV principal
+    store = _linhas_store()
+    if _dataset.linhas_data.versao == versao_linhas:
+        linhas_data = _dataset.linhas_data
+    else:
+        try:
+            linhas_data = load_shared_linhas(os.path.join(BASE_DIR, CSV_LINHAS), _dataset.resolver, _dataset.idx_jogador)
+        except Exception as e:
+            print(f"Erro ao recarregar linhas.csv: {e}")
+            anterior = store.get("linhas")
+            return anterior if anterior is not None and anterior.versao != "" else _dataset.linhas_data
+    store["linhas"] = linhas_data
+    return linhas_data
 
 # --- Carregamento Inicial ---
-df_completo, df_linhas, df_players_images = load_all_data()
+# A versão (tamanho + mtime) do CSV principal entra na chave do cache: linhas anexadas disparam a ingestão incremental
+with timer.span("load_all_data"):
+    versao_stats = file_version(os.path.join(BASE_DIR, CSV_STATS))
+    dataset = load_all_data(versao_stats)
 
-if df_completo is None:
+if dataset is None:
     st.stop() # Para a execução se os arquivos não foram carregados
 
+with timer.span("load_linhas"):
+    linhas_data = load_linhas_data(versao_stats, file_version(os.path.join(BASE_DIR, CSV_LINHAS)), dataset)
+
+# Resultados do LRU de versões anteriores do dataset são descartados aqui; o prefetch nunca troca a versão
+_analysis_cache().set_version(dataset.versao)
+
+# Visões rasas do dataset compartilhado (sem cópia dos dados)
+df_completo, df_players_images = dataset.stats, dataset.players_images
+idx_jogador = dataset.idx_jogador
+rosters = dataset.rosters
+
 # --- Função para buscar Próximos Jogos (API NBA) ---
-@st.cache_data(ttl=3600, show_spinner=False)
-def get_nba_schedule():
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    file_path = os.path.join(base_dir, "jogos.csv")
-    
-    # Correção para Linux/Github: Procura o arquivo ignorando maiúsculas/minúsculas
-    if not os.path.exists(file_path):
-        for f in os.listdir(base_dir):
-            if f.lower() == "jogos.csv":
-                file_path = os.path.join(base_dir, f)
-                break
-        if not os.path.exists(file_path): return {}
-    
+@st.cache_resource(max_entries=1, show_spinner=False)
+def load_season_schedule(versao_jogos):
+    # Lido uma vez por versão (tamanho + mtime) de jogos.csv
+    file_path = find_schedule_file(BASE_DIR)
+    if file_path is None:
+        return None
+    aquecida = take_warmed("agenda", versao_jogos)
+    if aquecida is not None:
+        return aquecida
     try:
-        # Tenta ler com separador ;
-        df = pd.read_csv(file_path, sep=';', encoding='utf-8')
-        
-        # Normaliza colunas para minúsculo e remove espaços
-        df.columns = [c.strip().lower() for c in df.columns]
-        
-        # Verifica se as colunas essenciais existem
-        if 'data_partida' not in df.columns or 'equipe_casa' not in df.columns:
-             # Fallback para tentar ler com vírgula se o separador não for ;
-             df = pd.read_csv(file_path, sep=',', encoding='utf-8')
-             df.columns = [c.strip().lower() for c in df.columns]
-
-        # Converte data (Formato explícito: dd/mm/yyyy hh:mm)
-        df['data_partida'] = df['data_partida'].astype(str).str.strip()
-        df['data_partida'] = pd.to_datetime(df['data_partida'], format='%d/%m/%Y %H:%M', errors='coerce')
-        
-        # Remove linhas com datas inválidas (NaT)
-        df = df.dropna(subset=['data_partida'])
-        
-        # Filtra hoje e próximos dias
-        # Correção de Fuso Horário: Servidores Cloud usam UTC. 
-        # Subtraímos 4h para garantir que jogos da noite (BRT/ET) apareçam mesmo se já virou o dia em UTC.
-        today = (datetime.now() - timedelta(hours=4)).replace(hour=0, minute=0, second=0, microsecond=0)
-        end_date = today + timedelta(days=7) 
-        
-        mask = (df['data_partida'] >= today) & (df['data_partida'] < end_date)
-        df_filtered = df[mask].copy().sort_values(by='data_partida', ascending=True)
-        
-        schedule = {}
-        
-        for _, row in df_filtered.iterrows():
-            d_lbl = row['data_partida'].strftime('%d/%m/%Y')
-            
-            # Nomes dos times
-            home_full = str(row.get('equipe_casa', '')).strip()
-            away_full = str(row.get('equipe_fora', '')).strip()
-            
-            game_id = row.get('gameid', f"{home_full}-{away_full}")
-            
-            # Extrai o último nome para o logo (ex: "Chicago Bulls" -> "bulls")
-            home_last = home_full.split()[-1].lower() if home_full else ""
-            away_last = away_full.split()[-1].lower() if away_full else ""
-            
-            # Caminhos dos logos
-            home_logo = os.path.join(base_dir, "assets", "teams", f"{home_last}.png")
-            away_logo = os.path.join(base_dir, "assets", "teams", f"{away_last}.png")
-            
-            # Status (Horário ou VS)
-            if row['data_partida'].hour != 0 or row['data_partida'].minute != 0:
-                status = row['data_partida'].strftime('%H:%M')
-            else:
-                status = "VS"
-            
-            if d_lbl not in schedule:
-                schedule[d_lbl] = []
-                
-            schedule[d_lbl].append({
-                "id": game_id,
-                "home": home_full,
-                "away": away_full,
-                "status": status,
-                "home_logo": home_logo,
-                "away_logo": away_logo
-            })
-            
-        return schedule
-
+        return parse_season_schedule(file_path, BASE_DIR)
     except Exception as e:
         print(f"Erro ao ler jogos.csv: {e}")
-        return {}
+        return None
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_schedule_window(versao_jogos, inicio, dias=7):
+    # Janela [inicio, inicio + dias) da temporada, compartilhada entre sessões
+    return schedule_window(load_season_schedule(versao_jogos), inicio, dias)
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_schedule_grids(versao_jogos, inicio, dias=7):
+    # Grade compacta de cada dia da janela, montada uma vez e compartilhada entre sessões. Com o mesmo conteúdo
+    # a cada rerun, o Streamlit reenvia só a referência das mensagens grandes (cache de ForwardMsg do navegador)
+    schedule = get_schedule_window(versao_jogos, inicio, dias)
+    return MappingProxyType({data: schedule_day_grid(jogos, get_logo_uri) for data, jogos in schedule.items()})
+
+def _janela_agenda():
+    # (versão de jogos.csv, início da janela) ou None se o arquivo não existir
+    file_path = find_schedule_file(BASE_DIR)
+    if file_path is None:
+        return None
+
+    # Filtra hoje e próximos dias
+    # Correção de Fuso Horário: Servidores Cloud usam UTC. 
+    # Subtraímos 4h para garantir que jogos da noite (BRT/ET) apareçam mesmo se já virou o dia em UTC.
+    today = (datetime.now() - timedelta(hours=4)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return file_version(file_path), today
+
+def get_nba_schedule(janela):
+    if janela is None:
+        return MappingProxyType({})
+    return get_schedule_window(*janela)
 
 def ir_para_analise(equipe, oponente, local):
     st.session_state.nav_radio = "Análise Individual"
@@ -403,11 +415,31 @@ def ir_para_analise(equipe, oponente, local):
     st.session_state.radio_local = local
     
     # Seleciona automaticamente o jogador com mais minutos (Top 1)
-    df_eq = df_completo[df_completo['Time_Full'] == equipe]
-    if not df_eq.empty:
-        df_min = df_eq.groupby('Nome_Full')['Minutos'].mean().sort_values(ascending=False)
-        if not df_min.empty:
-            st.session_state.combo_jog = df_min.index[0]
+    elenco = rosters.get(equipe)
+    if elenco:
+        st.session_state.combo_jog = elenco[0]
+
+ALTURA_LINHA_GRADE = 36
+COLUNAS_GRADE_AGENDA = {
+    "Logo Casa": st.column_config.ImageColumn("", width="small"),
+    "Casa": st.column_config.TextColumn("Casa", width="medium"),
+    "Horário": st.column_config.TextColumn("", width="small"),
+    "Fora": st.column_config.TextColumn("Fora", width="medium"),
+    "Logo Fora": st.column_config.ImageColumn("", width="small"),
+}
+
+def ir_para_analise_grade(key, jogos):
+    # Clique em uma célula da grade compacta: o nome ou o logo de um time abre a análise daquele lado
+    celulas = st.session_state[key].selection.cells
+    if not celulas:
+        return
+    linha, coluna = celulas[0]
+    jogo = jogos[linha]
+    lado = LADO_GRADE_AGENDA.get(coluna)
+    if lado == "Casa":
+        ir_para_analise(jogo['home'], jogo['away'], "Casa")
+    elif lado == "Fora":
+        ir_para_analise(jogo['away'], jogo['home'], "Fora")
 
 def inverter_times_local():
     # Pega valores atuais
@@ -430,11 +462,9 @@ def inverter_times_local():
         
     # Seleciona automaticamente o jogador com mais minutos da nova equipe
     if new_eq != "Selecione a Equipe...":
-        df_eq = df_completo[df_completo['Time_Full'] == new_eq]
-        if not df_eq.empty:
-            df_min = df_eq.groupby('Nome_Full')['Minutos'].mean().sort_values(ascending=False)
-            if not df_min.empty:
-                st.session_state.combo_jog = df_min.index[0]
+        elenco = rosters.get(new_eq)
+        if elenco:
+            st.session_state.combo_jog = elenco[0]
 
 # --- Inicialização do Estado da Sessão ---
 if 'filtro_local' not in st.session_state:
@@ -442,26 +472,41 @@ if 'filtro_local' not in st.session_state:
 
 # --- Funções de Lógica ---
 def get_player_photo_path(nome_jogador):
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    path_foto = None
-    path_assets_players = os.path.join(base_dir, "assets", "players")
-
-    if df_players_images is not None and 'Nome_Full' in df_players_images.columns:
-        match = df_players_images[df_players_images['Nome_Full'].str.lower() == nome_jogador.lower()]
-        if not match.empty:
-            rel_path = match.iloc[0].get('image_path')
-            if pd.notna(rel_path):
-                str_path = str(rel_path).replace("/", os.sep)
-                path_foto = os.path.join(base_dir, str_path)
-
-    if not path_foto or not os.path.exists(path_foto):
-        path_foto = os.path.join(path_assets_players, f"{nome_jogador}.png")
-
-    if os.path.exists(path_foto):
+    # Lookup no índice de fotos montado no carregamento (sem varrer o DF nem checar o disco)
+    path_foto = dataset.fotos.get(str(nome_jogador).lower())
+    if path_foto:
         return path_foto
     
     # Fallback para imagem padrão
-    return os.path.join(base_dir, "assets", "perfiljogador.png")
+    return os.path.join(BASE_DIR, "assets", "perfiljogador.png")
+
+# --- Piso x Linhas e Tips do Dia (cache do processo) ---
+@st.cache_resource
+def _piso_store():
+    # Por período: (versão do CSV principal, estado do último quadro calculado), base do recálculo incremental
+    return {}
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def get_quadros_linhas(versao_stats, linhas_hash, periodo, _df_completo, _idx_jogador, _linhas_data):
+    # (Piso x Linhas, Tips) memoizados por (versão do CSV principal, hash do conteúdo de linhas.csv, período);
+    # vêm do batch offline quando ele foi gerado com os mesmos arquivos, senão são calculados aqui.
+    # Com o mesmo CSV principal, uma nova versão de linhas.csv só recalcula as linhas novas ou alteradas
+    # (Tips é refeito sobre o quadro inteiro: uma passada vetorizada). O prefetch de Próximos Jogos
+    # deixa o resultado no LRU de análises, na mesma chave
+    pre_calculado = load_batch_tables(BATCH_DIR, versao_stats, linhas_hash, periodo, CORTE_STATS)
+    if pre_calculado is not None:
+        return pre_calculado
+
+    def calcular():
+        store = _piso_store()
+        versao_anterior, estado = store.get(periodo, (None, None))
+        df_piso, estado, recalculadas = update_piso_linhas(
+            _df_completo, _idx_jogador, _linhas_data.linhas, periodo,
+            estado if versao_anterior == versao_stats else None, hashes=_linhas_data.row_hashes)
+        store[periodo] = (versao_stats, estado)
+        print(f"Piso x Linhas ({periodo}): {recalculadas} de {len(_linhas_data.row_hashes)} linhas recalculadas")
+        return df_piso, calc_tips(df_piso)
+    return _analysis_cache().get_or_compute(piso_cache_key(versao_stats, linhas_hash, periodo), calcular)
 
 
 # =================================================================
@@ -469,7 +514,7 @@ def get_player_photo_path(nome_jogador):
 # =================================================================
 
 # --- Barra Lateral (Sidebar) para Filtros ---
-with st.sidebar:
+with st.sidebar, timer.span("sidebar"):
     st.title("Carielo NBA")
     
     # Navegação Principal
@@ -481,7 +526,7 @@ with st.sidebar:
         st.header("Filtros de Análise")
 
         # Filtro de Equipe
-        lista_equipes = sorted([e for e in df_completo['Time_Full'].unique() if str(e) != 'nan'])
+        lista_equipes = list(dataset.equipes)
         equipe_selecionada = st.selectbox(
             "Equipe",
             options=["Selecione a Equipe..."] + lista_equipes,
@@ -489,9 +534,8 @@ with st.sidebar:
         )
         # Filtro de Jogador (dinâmico)
         if equipe_selecionada != "Selecione a Equipe...":
-            df_eq = df_completo[df_completo['Time_Full'] == equipe_selecionada].copy()
-            df_min_medias = df_eq.groupby('Nome_Full')['Minutos'].mean().sort_values(ascending=False)
-            lista_jogadores = df_min_medias.index.tolist()
+            # Elenco pré-ordenado por média de minutos (lookup, sem groupby por rerun)
+            lista_jogadores = list(rosters.get(equipe_selecionada, ()))
         else:
             lista_jogadores = []
 
@@ -502,7 +546,7 @@ with st.sidebar:
         )
 
         # Filtro de Adversário
-        lista_opp = sorted([e for e in df_completo['Opp_Full'].unique() if str(e) != 'nan'])
+        lista_opp = list(dataset.oponentes)
         opp_selecionado = st.selectbox(
             "Próximo Adversário",
             options=["Selecione..."] + lista_opp,
@@ -516,17 +560,19 @@ with st.sidebar:
         st.caption("CONTEXTO DA ANÁLISE")
         st.session_state.filtro_local = st.radio(
             "Local da Partida",
-            options=["Geral", "Casa", "Fora"],
+            options=LOCAIS,
             horizontal=True,
             key="radio_local"
         )
 
-        periodo_selecionado = st.selectbox(
+        # Últimos N jogos (slider livre) ou a temporada inteira; a janela é uma máscara sobre o rank de recência
+        janela_jogos = st.select_slider(
             "Período dos Jogos",
-            options=["Todos", "Últimos 5", "Últimos 10"],
-            index=2, # Padrão "Últimos 10"
+            options=list(range(JANELA_MIN, JANELA_MAX + 1)) + [PERIODO_TEMPORADA],
+            value=10, # Padrão "Últimos 10"
             key="combo_qtd"
         )
+        periodo_selecionado = periodo_label(None if janela_jogos == PERIODO_TEMPORADA else janela_jogos)
 
         st.markdown("---")
         if st.button("🔄 Limpar Filtros"):
@@ -543,45 +589,76 @@ col_main, col_info = st.columns([2.5, 1])
 
 if st.session_state.nav_radio == "Próximos Jogos":
     st.markdown("### 📅 Próximos Jogos (NBA)")
-    schedule = get_nba_schedule()
+    agenda_compacta = st.toggle("Modo compacto", value=AGENDA_COMPACTA, key="agenda_compacta",
+                                help="Uma tabela por dia: clique no nome ou no logo de um time para abrir a análise")
+    with timer.span("schedule_window"):
+        janela_agenda = _janela_agenda()
+        schedule = get_nba_schedule(janela_agenda)
     
-    if not schedule:
-        st.info("Nenhum jogo encontrado para os próximos dias ou erro na API.")
-    else:
-        for date_lbl, games in schedule.items():
-            st.subheader(f"Jogos de {date_lbl}")
-            if not games:
-                st.write("Sem jogos agendados.")
-                continue
+    with timer.span("render_proximos_jogos"):
+        if not schedule:
+            st.info("Nenhum jogo encontrado para os próximos dias ou erro na API.")
+        elif agenda_compacta:
+            # Um elemento por dia (tabela com logos em cache) em vez de container + colunas + imagens + botões por jogo
+            grades = get_schedule_grids(*janela_agenda)
+            for date_lbl, games in schedule.items():
+                st.subheader(f"Jogos de {date_lbl}")
+                if not games:
+                    st.write("Sem jogos agendados.")
+                    continue
+                key_grade = f"grade_jogos_{date_lbl}"
+                st.dataframe(grades[date_lbl], key=key_grade, on_select=lambda k=key_grade, g=games: ir_para_analise_grade(k, g),
+                             selection_mode="single-cell", hide_index=True, use_container_width=True,
+                             row_height=ALTURA_LINHA_GRADE, height=(len(games) + 1) * ALTURA_LINHA_GRADE + 3,
+                             column_config=COLUNAS_GRADE_AGENDA)
+        else:
+            for date_lbl, games in schedule.items():
+                st.subheader(f"Jogos de {date_lbl}")
+                if not games:
+                    st.write("Sem jogos agendados.")
+                    continue
                 
-            for game in games:
-                with st.container(border=True): # Cada jogo em seu container
-                    c1, c2, c3 = st.columns([2.5, 0.8, 2.5]) # Colunas para Casa | VS | Fora
+                for game in games:
+                    with st.container(border=True): # Cada jogo em seu container
+                        c1, c2, c3 = st.columns([2.5, 0.8, 2.5]) # Colunas para Casa | VS | Fora
                     
-                    # Time da Casa
-                    with c1:
-                        col_i, col_b = st.columns([1, 2]) # Coluna para Logo e Botão
-                        with col_i:
-                            if os.path.exists(game['home_logo']):
-                                st.image(game['home_logo'], width=40) # Imagem menor
-                        with col_b:
-                            st.button(f"{game['home']}", key=f"btn_home_{game['id']}", use_container_width=True,
-                                      on_click=ir_para_analise, args=(game['home'], game['away'], "Casa"))
+                        # Time da Casa
+                        with c1:
+                            col_i, col_b = st.columns([1, 2]) # Coluna para Logo e Botão
+                            with col_i:
+                                if game['home_logo']:
+                                    st.image(get_thumbnail(game['home_logo'], 80), width=40) # Miniatura em cache (2x para telas retina)
+                            with col_b:
+                                st.button(f"{game['home']}", key=f"btn_home_{game['id']}", use_container_width=True,
+                                          on_click=ir_para_analise, args=(game['home'], game['away'], "Casa"))
                     
-                    # Info Central
-                    with c2:
-                        # Adiciona um pouco de margem para alinhar melhor verticalmente
-                        st.markdown(f"<div style='text-align: center; font-weight: bold; margin-top: 5px;'>VS<br><span style='font-size: 0.7em; color: gray;'>{game['status']}</span></div>", unsafe_allow_html=True)
+                        # Info Central
+                        with c2:
+                            # Adiciona um pouco de margem para alinhar melhor verticalmente
+                            st.markdown(f"<div style='text-align: center; font-weight: bold; margin-top: 5px;'>VS<br><span style='font-size: 0.7em; color: gray;'>{game['status']}</span></div>", unsafe_allow_html=True)
                     
-                    # Time Visitante
-                    with c3:
-                        col_b, col_i = st.columns([2, 1]) # Coluna para Botão e Logo
-                        with col_b:
-                            st.button(f"{game['away']}", key=f"btn_away_{game['id']}", use_container_width=True,
-                                      on_click=ir_para_analise, args=(game['away'], game['home'], "Fora"))
-                        with col_i:
-                            if os.path.exists(game['away_logo']):
-                                st.image(game['away_logo'], width=40) # Imagem menor
+                        # Time Visitante
+                        with c3:
+                            col_b, col_i = st.columns([2, 1]) # Coluna para Botão e Logo
+                            with col_b:
+                                st.button(f"{game['away']}", key=f"btn_away_{game['id']}", use_container_width=True,
+                                          on_click=ir_para_analise, args=(game['away'], game['home'], "Fora"))
+                            with col_i:
+                                if game['away_logo']:
+                                    st.image(get_thumbnail(game['away_logo'], 80), width=40) # Miniatura em cache (2x para telas retina)
+
+    # Aquecimento em segundo plano (não bloqueia o rerun): seleções que um clique nos jogos da janela abre
+    # (jogadores com mais minutos de cada lado x adversário, H2H, gaps e média cedida) e os quadros de
+    # Piso/Tips do período atual, para a primeira análise já sair do cache
+    if schedule and PREFETCH_ATIVO:
+        with timer.span("prefetch"):
+            # Período que a análise vai usar depois do clique (o slider fica só na tela de análise; padrão 10)
+            janela_prefetch = st.session_state.get("combo_qtd", 10)
+            periodo_prefetch = periodo_label(None if janela_prefetch == PERIODO_TEMPORADA else janela_prefetch)
+            tarefas = matchup_prefetch_tasks(_analysis_cache(), dataset, schedule, periodo_prefetch)
+            if not has_batch_tables(BATCH_DIR, dataset.versao, linhas_data.hash, periodo_prefetch, CORTE_STATS):
+                tarefas += piso_prefetch_tasks(_analysis_cache(), dataset, linhas_data, periodo_prefetch)
+            _prefetcher().submit(tarefas)
 
 else:
     # --- Lógica Original da Tela de Análise ---
@@ -599,37 +676,23 @@ else:
     # --- Lógica de Filtragem Principal ---
     tem_jogador = jogador_selecionado != "Selecione o Jogador..."
     
-    if tem_jogador:
-        df_principal = df_completo[df_completo['Nome_Full'] == jogador_selecionado].copy()
-    elif equipe_selecionada != "Selecione a Equipe...":
-        df_principal = df_completo[df_completo['Time_Full'] == equipe_selecionada].copy()
-    else:
-        df_principal = df_completo.copy()
-
-    df_principal = df_principal.sort_values(by='Data_Hora_Jogo', ascending=False)
-
-    for c in ['Pontos', 'Rebotes', 'Assistencias', '3PTS_Feitos', 'Minutos', 'Tocos', 'Roubos de bola', 'Erros / Perdas de posse']:
-        if c in df_principal.columns:
-            df_principal[c] = pd.to_numeric(df_principal[c], errors='coerce').fillna(0)
-
-    df_principal['P+R'] = df_principal['Pontos'] + df_principal['Rebotes']
-    # df_principal = df_principal[(df_principal['Pontos'] + df_principal['Rebotes'] + df_principal['Assistencias']) > 0].copy()
-
-    # Aplica filtros de contexto (local e período)
-    df_filtrado = df_principal.copy()
-    if st.session_state.filtro_local == "Casa":
-        df_filtrado = df_filtrado[df_filtrado['Casa'] == 1]
-    elif st.session_state.filtro_local == "Fora":
-        df_filtrado = df_filtrado[df_filtrado['Casa'] == 0]
-
-    if periodo_selecionado == "Últimos 5":
-        df_filtrado = df_filtrado.head(5)
-    elif periodo_selecionado == "Últimos 10":
-        df_filtrado = df_filtrado.head(10)
+    with timer.span("filtros"):
+        # Linhas base (jogador pelo índice, equipe ou base inteira), filtros de contexto (local e período), H2H, MMM
+        # e defesa do oponente: memoizados por seleção no LRU do processo, reaproveitados entre reruns e sessões
+        sel_jogador = jogador_selecionado if tem_jogador else None
+        sel_equipe = equipe_selecionada if not tem_jogador and equipe_selecionada != "Selecione a Equipe..." else None
+        sel_opp = opp_selecionado if opp_selecionado != "Selecione..." else None
+        chave_selecao = (dataset.versao, sel_jogador, sel_equipe, sel_opp, st.session_state.filtro_local, periodo_selecionado)
+        selecao = _analysis_cache().get_or_compute(chave_selecao, lambda: analyze_selection(
+            dataset, jogador=sel_jogador, equipe=sel_equipe, oponente=sel_opp,
+            local=st.session_state.filtro_local, periodo=periodo_selecionado,
+        ))
+        # df_principal = df_principal[(df_principal['Pontos'] + df_principal['Rebotes'] + df_principal['Assistencias']) > 0].copy()
+        df_principal, df_filtrado = selecao["principal"], selecao["filtrado"]
 
 
     # --- Coluna da Direita: Perfil e Análise de Confronto ---
-    with col_info:
+    with col_info, timer.span("confronto"):
         # 2. Análise de Confronto (MOVEMOS PARA CIMA)
         if tem_jogador:
             st.subheader("Confronto")
@@ -638,9 +701,9 @@ else:
             with st.container(border=True):
                 st.markdown("**Head-to-Head (H2H)**")
                 if opp_selecionado != "Selecione...":
-                    df_h2h = df_principal[df_principal['Opp_Full'] == opp_selecionado]
+                    df_h2h = selecao["h2h"]
                     if not df_h2h.empty:
-                        mean_h2h = df_h2h[['Pontos', 'Rebotes', 'Assistencias', 'P+R']].mean()
+                        mean_h2h = selecao["h2h_medias"]
                         st.markdown(f"Jogos: **{len(df_h2h)}**")
                         st.markdown(f"PTS: **{mean_h2h['Pontos']:.1f}** | REB: **{mean_h2h['Rebotes']:.1f}** | AST: **{mean_h2h['Assistencias']:.1f}**")
                     else:
@@ -651,10 +714,9 @@ else:
             # Defensive Gaps
             st.markdown("**Defensive Gaps**")
             if opp_selecionado != "Selecione...":
-                df_opp_sofre = df_completo[df_completo['Opp_Full'] == opp_selecionado].copy()
-                if not df_opp_sofre.empty and 'Posicao_Jogador' in df_opp_sofre.columns:
-                    stats_pos = df_opp_sofre.groupby('Posicao_Jogador')[['Pontos', 'Rebotes', '3PTS_Feitos']].mean().sort_values(by='Pontos', ascending=False).head(3)
-                    stats_pos = stats_pos.reset_index().rename(columns={"Posicao_Jogador": "POS", "Pontos": "PTS", "Rebotes": "REB", "3PTS_Feitos": "3PTS"})
+                # Lookup no cubo de defesa (oponente x posição exata, temporada inteira)
+                stats_pos = selecao["gaps"]
+                if stats_pos is not None:
                     st.dataframe(stats_pos, hide_index=True, use_container_width=True)
             else:
                 st.info("Selecione adversário")
@@ -667,56 +729,67 @@ else:
                 bet_labels = ["PTS", "REB", "AST", "P+R", "3P"] # Reorganizado para fluir melhor
                 bet_keys = ["pts", "reb", "ast", "pr", "3p"]
 
-                linha_jogador_df = df_linhas[df_linhas['jogador'].astype(str).str.contains(jogador_selecionado, case=False, na=False, regex=False)]
+                linha_padrao = linha_do_jogador(linhas_data, jogador_selecionado, bet_keys)
                 
                 for i, (label, key) in enumerate(zip(bet_labels, bet_keys)):
-                    default_val = ""
-                    if not linha_jogador_df.empty and key in linha_jogador_df.columns:
-                        val = linha_jogador_df.iloc[0][key]
-                        if pd.notna(val):
-                            default_val = str(val)
-                    
                     col = bet_cols[i]
-                    bet_inputs[key] = col.text_input(label, value=default_val, key=f"bet_{key}")
+                    bet_inputs[key] = col.text_input(label, value=linha_padrao[key], key=f"bet_{key}")
 
             # Projeção vs Linha
             with st.container(border=True):
                 st.markdown("**Projeção vs Linha**")
                 if not df_filtrado.empty:
-                    # Garante coluna P+R
-                    df_filtrado['P+R'] = df_filtrado['Pontos'] + df_filtrado['Rebotes']
-                    
                     stats_config = [
                         ("PTS", "Pontos", "pts"),
                         ("REB", "Rebotes", "reb"),
                         ("P+R", "P+R", "pr"),
-                        ("AST", "Assistencias", "ast")
+                        ("AST", "Assistencias", "ast"),
+                        ("3PM", "3PTS_Feitos", "3p")
                     ]
                     
-                    proj_data = []
-                    for label, col_df, key_bet in stats_config:
-                        # 1. Mediana (Insights)
-                        mediana = df_filtrado[col_df].median()
-                        qtd_over_med = len(df_filtrado[df_filtrado[col_df] > mediana])
-                        pct_med = (qtd_over_med / len(df_filtrado)) * 100
-                        
-                        # 2. Linha da Bet (Input do usuário)
-                        linha_val_str = st.session_state.get(f"bet_{key_bet}", "")
-                        pct_line_str = "-"
-                        if linha_val_str:
-                            try:
-                                linha_val = float(linha_val_str.replace(",", "."))
-                                qtd_over_line = len(df_filtrado[df_filtrado[col_df] > linha_val])
-                                pct_line = (qtd_over_line / len(df_filtrado)) * 100
-                                pct_line_str = f"{pct_line:.0f}%"
-                            except ValueError:
-                                pass
-                        
-                        proj_data.append({"Stat": label, "% > Med": f"{pct_med:.0f}%", "% > Line": pct_line_str})
+                    linhas_bet = {key: st.session_state.get(f"bet_{key}", "") for _, _, key in stats_config}
+                    # Prob Fit: ajuste Poisson/normal dos jogos filtrados; Prob Rec: % > Line com peso maior nos jogos recentes
+                    proj_data = [
+                        {"Stat": p["Stat"], "% > Med": f"{p['% > Med']:.0f}%",
+                         **{col: f"{p[col]:.0f}%" if p[col] is not None else "-" for col in ["% > Line", "Prob Fit", "Prob Rec"]}}
+                        for p in projecao_vs_linha(df_filtrado, linhas_bet, stats_config, selecao["ordenados"])
+                    ]
                     
                     st.dataframe(pd.DataFrame(proj_data), hide_index=True, use_container_width=True)
                 else:
                     st.write("Sem dados.")
+
+            # Escada de Linhas Alternativas (Over / Under por degrau, sobre os jogos filtrados)
+            with st.container(border=True):
+                st.markdown("**🪜 Escada de Linhas (Alt Lines)**")
+                if not df_filtrado.empty:
+                    mercados_escada = {label: (col_df, key_bet, passo) for label, col_df, key_bet, passo in MERCADOS_ESCADA}
+                    mercado_escada = st.selectbox("Mercado", list(mercados_escada), key="escada_mercado", label_visibility="collapsed")
+                    col_df, key_bet, passo = mercados_escada[mercado_escada]
+                    texto_escada = st.text_input("Linhas alternativas", key="escada_linhas", placeholder="ex.: 14.5, 17.5, 20.5, 23.5",
+                                                 help="Vazio: linha da bet (ou mediana) com degraus de cada lado")
+                    limiares = None
+                    if texto_escada.strip():
+                        try:
+                            limiares = parse_alt_lines(texto_escada)
+                        except ValueError:
+                            st.warning("Use números separados por espaço ou vírgula e espaço (ex.: 14.5, 17.5, 20.5).")
+                    linha_base = None
+                    try:
+                        linha_base = float(str(st.session_state.get(f"bet_{key_bet}", "")).replace(",", "."))
+                    except ValueError:
+                        pass
+                    df_escada = alt_line_ladder(selecao["ordenados"], col_df, passo, linha=linha_base, limiares=limiares or None)
+                    if not df_escada.empty:
+                        st.dataframe(
+                            df_escada, hide_index=True, use_container_width=True,
+                            column_config={
+                                "Linha": st.column_config.NumberColumn("Linha", format="%.1f"),
+                                **{c: st.column_config.NumberColumn(c, format="%.0f%%") for c in ["Over %", "Under %", "Push %"]},
+                            }
+                        )
+                else:
+                    st.write("Sem dados.")
         else:
             st.info("Selecione um jogador para ver a análise detalhada de confronto e projeções.")
 
@@ -724,13 +797,14 @@ else:
     with col_main:
         # --- Perfil do Jogador (Movido para cá) ---
         if tem_jogador:
-            with st.container(border=True):
+            with st.container(border=True), timer.span("perfil"):
                 c1, c2 = st.columns([0.5, 4])
                 path_foto = get_player_photo_path(jogador_selecionado)
-                if os.path.exists(path_foto):
-                    c1.image(path_foto, width=80)
+                thumb_foto = get_thumbnail(path_foto, 160)
+                if thumb_foto:
+                    c1.image(thumb_foto, width=80)
                 
-                posicao = df_principal['Posicao_Jogador'].iloc[0] if 'Posicao_Jogador' in df_principal.columns and not df_principal.empty else "N/A"
+                posicao = selecao["posicao"]
                 c2.markdown(f"### {jogador_selecionado.upper()}")
                 c2.caption(f"Posição: {posicao}")
 
@@ -742,104 +816,10 @@ else:
             return [''] * len(row)
 
         # --- Cálculo de Métricas e Dicas (Movido para antes das abas) ---
-        metric_data = []
-        tips_automaticas = []
-
-        for _, row_l in df_linhas.iterrows():
-            nome_j = str(row_l.get('jogador', '')).strip()
-            equipe_j_abrev = str(row_l.get('equipe', '')).strip()
-            equipe_j_full = ABREV_PARA_FULL.get(equipe_j_abrev, equipe_j_abrev)
-            detalhe = str(row_l.get('detalhe', '')).strip()
-            
-            # Filtro Casa/Fora baseado na coluna 'casa' do linhas.csv
-            try:
-                is_home_game = int(float(str(row_l.get('casa', -1))))
-            except:
-                is_home_game = -1
-
-            # (Filtros de Sidebar removidos para Insights e Tips serem independentes)
-
-            try:
-                v_pts = float(str(row_l.get('pts', 0)).replace(',', '.'))
-                v_rbt = float(str(row_l.get('reb', 0)).replace(',', '.'))
-                v_pr = float(str(row_l.get('pr', 0)).replace(',', '.'))
-            except: continue
-
-            # Exibe somente jogadores que tem valores na planilha de linhas preenchidos (pelo menos uma linha > 0)
-            if (pd.isna(v_pts) or v_pts <= 0) and (pd.isna(v_rbt) or v_rbt <= 0) and (pd.isna(v_pr) or v_pr <= 0):
-                continue
-
-            df_j_metric = df_completo[df_completo['Nome_Full'].str.contains(nome_j, case=False, na=False)].copy()
-            
-            if not df_j_metric.empty:
-                # (Filtros de Jogador e Local removidos para Insights e Tips serem independentes - Usa Geral)
-                
-                df_j_metric = df_j_metric.sort_values(by='Data_Hora_Jogo', ascending=False)
-                if periodo_selecionado == "Últimos 5": df_j_metric = df_j_metric.head(5)
-                elif periodo_selecionado == "Últimos 10": df_j_metric = df_j_metric.head(10)
-
-                total = len(df_j_metric)
-                if total > 0:
-                    # Garante que as colunas de estatísticas sejam numéricas e sem NaN
-                    for col in ['Pontos', 'Rebotes', 'Assistencias', 'blocks', 'steals', 'turnovers']:
-                        if col in df_j_metric.columns:
-                            df_j_metric[col] = pd.to_numeric(df_j_metric[col], errors='coerce').fillna(0)
-                    
-                    df_j_metric['P+R'] = df_j_metric['Pontos'] + df_j_metric['Rebotes']
-                    
-                    # Mins
-                    mins = df_j_metric[['Pontos', 'Rebotes', 'P+R']].min()
-
-                    # ... (Lógica de cálculo de confiança mantida simplificada aqui para brevidade, mas o código original já faz isso) ...
-                    # Recalculando confiança para garantir variáveis
-                    def calc_conf(min_val, line_val):
-                        if pd.isna(line_val) or line_val == 0: return 0.0
-                        if pd.isna(min_val): return 0.0
-                        return (min_val / line_val) * 100
-
-                    conf_pts = calc_conf(mins['Pontos'], v_pts)
-                    conf_reb = calc_conf(mins['Rebotes'], v_rbt)
-                    conf_pr = calc_conf(mins['P+R'], v_pr)
-
-                    # Lógica para Tips Automáticas (> 75% Confiança)
-                    if conf_pts > 75:
-                        over_count = len(df_j_metric[df_j_metric['Pontos'] > v_pts])
-                        tips_automaticas.append({
-                            "JOGADOR": nome_j, "TIME": equipe_j_full, "MERCADO": "Pontos", 
-                            "LINHA": v_pts, "PISO": int(mins['Pontos']), "CONFIANÇA": conf_pts,
-                            "MÉDIA": f"{over_count} de {total}"
-                        })
-                    if conf_reb > 75:
-                        over_count = len(df_j_metric[df_j_metric['Rebotes'] > v_rbt])
-                        tips_automaticas.append({
-                            "JOGADOR": nome_j, "TIME": equipe_j_full, "MERCADO": "Rebotes", 
-                            "LINHA": v_rbt, "PISO": int(mins['Rebotes']), "CONFIANÇA": conf_reb,
-                            "MÉDIA": f"{over_count} de {total}"
-                        })
-                    if conf_pr > 75:
-                        over_count = len(df_j_metric[df_j_metric['P+R'] > v_pr])
-                        tips_automaticas.append({
-                            "JOGADOR": nome_j, "TIME": equipe_j_full, "MERCADO": "P+R", 
-                            "LINHA": v_pr, "PISO": int(mins['P+R']), "CONFIANÇA": conf_pr,
-                            "MÉDIA": f"{over_count} de {total}"
-                        })
-
-                    p_pts = (len(df_j_metric[df_j_metric['Pontos'] > v_pts]) / total * 100) if not pd.isna(v_pts) else 0
-                    p_rbt = (len(df_j_metric[df_j_metric['Rebotes'] > v_rbt]) / total * 100) if not pd.isna(v_rbt) else 0
-                    p_pr = (len(df_j_metric[df_j_metric['P+R'] > v_pr]) / total * 100) if v_pr > 0 and not pd.isna(v_pr) else 0
-
-                    metric_data.append({
-                        "EQUIPE": equipe_j_full, "JOGADOR": nome_j, 
-                        "L_PTS": int(v_pts) if not pd.isna(v_pts) else 0, "MIN PTS": int(mins['Pontos']), "CONF PTS": int(conf_pts), "PTS %": f"{p_pts:.0f}%",
-                        "L_REB": int(v_rbt) if not pd.isna(v_rbt) else 0, "MIN REB": int(mins['Rebotes']), "CONF REB": int(conf_reb), "REB %": f"{p_rbt:.0f}%",
-                        "L_PR": int(v_pr) if not pd.isna(v_pr) else 0, "MIN PR": int(mins['P+R']), "CONF PR": int(conf_pr), "PR %": f"{p_pr:.0f}%",
-                        "DETALHE": detalhe
-                    })
-
-        if metric_data:
-            df_consolidado_dicas = pd.DataFrame(metric_data)
-        else:
-            df_consolidado_dicas = pd.DataFrame()
+        # Quadro numérico único (Piso, Confiança e Hit Rate) para todas as linhas e a seleção de Tips feita sobre ele,
+        # memoizados por (linhas.csv, período)
+        with timer.span("piso_linhas"):
+            df_consolidado_dicas, df_tips = get_quadros_linhas(dataset.versao, linhas_data.hash, periodo_selecionado, df_completo, idx_jogador, linhas_data)
 
         # --- Abas de Conteúdo ---
         tab_analise, tab_h2h, tab_linhas, tab_tips = st.tabs([
@@ -849,7 +829,7 @@ else:
             "   TIPS DO DIA 💰  "
         ])
 
-        with tab_analise:
+        with tab_analise, timer.span("tab_analise"):
             if not tem_jogador:
                 st.info("👆 Selecione um jogador no menu lateral para visualizar as estatísticas individuais.")
             elif df_filtrado.empty:
@@ -857,11 +837,8 @@ else:
             else:
                 st.subheader("Estatísticas do Jogador")
                 
-                # Variável independente para esta tela para evitar conflitos
-                df_stats_indiv = df_filtrado.copy()
-                
-                # Tratamento da coluna Local para exibição
-                df_stats_indiv['LOCAL_DISPLAY'] = df_stats_indiv['Casa'].apply(lambda x: "Casa" if x == 1 else "Fora")
+                # Tabela de exibição (coluna Local e minutos sem NaN) já preparada no resultado da seleção
+                df_stats_indiv = selecao["exibicao"]
                 
                 # Mapeamento de colunas conforme solicitado
                 colunas_tabela = {
@@ -898,17 +875,14 @@ else:
                 st.markdown("---")
                 st.subheader("MMM (Mediana / Mínimo / Máximo)")
                 
-                cols_mmm = ['Pontos', 'Rebotes', 'Assistencias', '3PTS_Feitos', 'Tocos', 'Roubos de bola', 'Erros / Perdas de posse']
                 rename_mmm = {
                     'Pontos': 'PTS', 'Rebotes': 'REB', 'Assistencias': 'AST', 
                     '3PTS_Feitos': '3PM', 'Tocos': 'BLK', 'Roubos de bola': 'STL', 
                     'Erros / Perdas de posse': 'TOV'
                 }
                 
-                cols_existentes = [c for c in cols_mmm if c in df_stats_indiv.columns]
-                if cols_existentes:
-                    df_mmm = df_stats_indiv[cols_existentes].agg(['median', 'min', 'max'])
-                    df_mmm.index = ['Mediana', 'Mínimo', 'Máximo']
+                df_mmm = selecao["mmm"]
+                if df_mmm is not None:
                     st.dataframe(df_mmm.rename(columns=rename_mmm), use_container_width=True)
                 
                 st.markdown("""
@@ -920,14 +894,14 @@ else:
                 </small>
                 """, unsafe_allow_html=True)
 
-        with tab_h2h:
+        with tab_h2h, timer.span("tab_h2h"):
             if not tem_jogador:
                 st.info("👆 Selecione um jogador no menu lateral.")
             elif opp_selecionado == "Selecione..." or opp_selecionado is None:
                 st.info("👆 Selecione um oponente no menu lateral para ver o histórico H2H.")
             else:
-                # Filtrar jogos contra o oponente (usando df_principal que já é do jogador)
-                df_h2h = df_principal[df_principal['Opp_Full'] == opp_selecionado].copy()
+                # Jogos contra o oponente (a partir de df_principal, que já é do jogador)
+                df_h2h = selecao["h2h"]
                 
                 if df_h2h.empty:
                     st.warning(f"Nenhum jogo encontrado de {jogador_selecionado} contra {opp_selecionado} na base de dados.")
@@ -942,9 +916,6 @@ else:
                         "Erros / Perdas de posse": "TOV", "Data_Limpa": "DATA",
                         "LOCAL_DISPLAY": "LOCAL", "Opp_Full": "OPONENTE"
                     }
-                    # Preparar Local
-                    df_h2h['LOCAL_DISPLAY'] = df_h2h['Casa'].apply(lambda x: "Casa" if x == 1 else "Fora")
-                    
                     cols_show = [c for c in colunas_h2h.keys() if c in df_h2h.columns]
                     st.dataframe(
                         df_h2h[cols_show].rename(columns=colunas_h2h),
@@ -954,16 +925,13 @@ else:
                     
                     # 2. Resumo MMM
                     st.markdown("##### Resumo de Desempenho (H2H)")
-                    cols_mmm = ['Pontos', 'Rebotes', 'Assistencias', '3PTS_Feitos', 'Tocos', 'Roubos de bola', 'Erros / Perdas de posse']
                     rename_mmm = {
                         'Pontos': 'PTS', 'Rebotes': 'REB', 'Assistencias': 'AST', 
                         '3PTS_Feitos': '3PM', 'Tocos': 'BLK', 'Roubos de bola': 'STL', 
                         'Erros / Perdas de posse': 'TOV'
                     }
-                    cols_existentes = [c for c in cols_mmm if c in df_h2h.columns]
-                    if cols_existentes:
-                        df_mmm_h2h = df_h2h[cols_existentes].agg(['median', 'min', 'max'])
-                        df_mmm_h2h.index = ['Mediana', 'Mínimo', 'Máximo']
+                    df_mmm_h2h = selecao["mmm_h2h"]
+                    if df_mmm_h2h is not None:
                         st.dataframe(df_mmm_h2h.rename(columns=rename_mmm), use_container_width=True)
                     
                     st.markdown("---")
@@ -971,24 +939,15 @@ else:
                     # 3. Análise Preditiva e Defensive Gaps
                     st.subheader("🔮 Análise de Confronto & Previsão")
                     
-                    posicao = df_principal['Posicao_Jogador'].iloc[0] if 'Posicao_Jogador' in df_principal.columns else "N/A"
+                    posicao = selecao["posicao"]
                     
-                    # Defensive Gaps (Oponente vs Posição)
-                    df_opp_defense = df_completo[df_completo['Opp_Full'] == opp_selecionado]
+                    # Defensive Gaps (Oponente vs Posição) - lookup no cubo, modo "contem" (ex.: "G" inclui "G-F");
+                    # sem a posição exata, usa o geral do time
+                    stats_allowed, pos_label = selecao["cedida"], selecao["cedida_label"]
                     
-                    if not df_opp_defense.empty and posicao != "N/A":
-                        # Tenta match da posição
-                        mask_pos = df_opp_defense['Posicao_Jogador'].astype(str).str.contains(posicao, na=False, regex=False)
-                        if not mask_pos.any():
-                             # Fallback se não achar exato, pega geral
-                             stats_allowed = df_opp_defense[['Pontos', 'Rebotes', 'Assistencias']].mean()
-                             pos_label = "Geral (Time)"
-                        else:
-                             stats_allowed = df_opp_defense[mask_pos][['Pontos', 'Rebotes', 'Assistencias']].mean()
-                             pos_label = posicao
-                        
-                        player_med = df_principal[['Pontos', 'Rebotes', 'Assistencias']].median()
-                        h2h_med = df_h2h[['Pontos', 'Rebotes', 'Assistencias']].median()
+                    if stats_allowed is not None and posicao != "N/A":
+                        player_med = selecao["mediana_jogador"]
+                        h2h_med = selecao["mediana_h2h"]
                         
                         c1, c2, c3 = st.columns(3)
                         c1.metric(f"Média Cedida ({pos_label})", f"{stats_allowed['Pontos']:.1f} PTS")
@@ -1014,7 +973,7 @@ else:
                     else:
                         st.warning("Dados insuficientes de posição ou defesa do oponente para gerar previsão detalhada.")
 
-        with tab_linhas:
+        with tab_linhas, timer.span("tab_linhas"):
             if df_consolidado_dicas.empty:
                 st.info("Nenhuma linha encontrada para os filtros selecionados.")
             else:
@@ -1032,7 +991,12 @@ else:
                 cols_to_show = [c for c in cols_map.keys() if c in df_consolidado_dicas.columns]
                 df_show = df_consolidado_dicas[cols_to_show].rename(columns=cols_map)
                 
-                st.dataframe(df_show, hide_index=True, use_container_width=True)
+                st.dataframe(
+                    df_show,
+                    hide_index=True,
+                    use_container_width=True,
+                    column_config={c: st.column_config.NumberColumn(c, format="%.0f%%") for c in ["Hit PTS %", "Hit REB %", "Hit PR %"]}
+                )
                 
                 st.markdown("""
                 <small>
@@ -1044,73 +1008,20 @@ else:
                 </small>
                 """, unsafe_allow_html=True)
 
-        with tab_tips:
+        with tab_tips, timer.span("tab_tips"):
             if df_consolidado_dicas.empty:
                 st.info("Nenhuma tip disponível. Ajuste os filtros ou verifique se há linhas disponíveis.")
             else:
-                tips_data = []
-                
-                # Itera sobre os dados consolidados para aplicar os filtros de Tips
-                for _, row in df_consolidado_dicas.iterrows():
-                    try:
-                        # Converte Hit Rate para inteiro
-                        hit_pts = int(str(row['PTS %']).replace('%', ''))
-                        hit_reb = int(str(row['REB %']).replace('%', ''))
-                        hit_pr = int(str(row['PR %']).replace('%', ''))
-                    except:
-                        continue
-                    
-                    conf_pts = row['CONF PTS']
-                    conf_reb = row['CONF REB']
-                    conf_pr = row['CONF PR']
-                    
-                    best_market = None
-                    best_power = -1
-                    
-                    # Verifica critérios: Conf >= 70% E Hit >= 60%
-                    # Mercado Pontos
-                    if conf_pts >= 70 and hit_pts >= 60:
-                        power = (conf_pts + hit_pts) / 2
-                        if power > best_power:
-                            best_power = power
-                            best_market = "PTS"
-                            
-                    # Mercado Rebotes
-                    if conf_reb >= 70 and hit_reb >= 60:
-                        power = (conf_reb + hit_reb) / 2
-                        if power > best_power:
-                            best_power = power
-                            best_market = "REB"
-                            
-                    # Mercado P+R
-                    if conf_pr >= 70 and hit_pr >= 60:
-                        power = (conf_pr + hit_pr) / 2
-                        if power > best_power:
-                            best_power = power
-                            best_market = "PR"
-                    
-                    if best_market:
-                        # Adiciona à lista final
-                        tips_data.append({
-                            "JOGADOR": row['JOGADOR'],
-                            "EQUIPE": row['EQUIPE'],
-                            "MERCADO": best_market,
-                            "CONF PTS": f"{conf_pts}%", "HIT PTS": f"{hit_pts}%",
-                            "CONF REB": f"{conf_reb}%", "HIT REB": f"{hit_reb}%",
-                            "CONF PR": f"{conf_pr}%", "HIT PR": f"{hit_pr}%",
-                            "POWER": int(best_power),
-                            "_sort": best_power
-                        })
-                
-                if tips_data:
-                    df_tips = pd.DataFrame(tips_data).sort_values(by='_sort', ascending=False).drop(columns=['_sort'])
-                    
+                if not df_tips.empty:
                     st.subheader("🔥 Melhores Oportunidades (Power >= 65%)")
                     st.dataframe(
                         df_tips,
                         hide_index=True,
                         use_container_width=True,
                         column_config={
+                            **{c: st.column_config.NumberColumn(c, format="%d%%") for c in df_tips.columns if c.startswith(("CONF ", "HIT "))},
+                            "PROB": st.column_config.NumberColumn("Prob", help="P(passar a linha) pelo ajuste Poisson/normal do período", format="%.0f%%"),
+                            "PROB REC": st.column_config.NumberColumn("Prob Rec", help="Hit Rate ponderado pela recência (jogos recentes pesam mais)", format="%.0f%%"),
                             "POWER": st.column_config.ProgressColumn(
                                 "Força (Power)",
                                 help="Média entre Confiança e Hit Rate",
@@ -1121,4 +1032,40 @@ else:
                         }
                     )
                 else:
-                    st.info("Nenhum jogador atende aos critérios de Tips (Conf >= 70% e Hit >= 60%) nos filtros selecionados.")
\ No newline at end of file
+                    st.info("Nenhum jogador atende aos critérios de Tips (Conf >= 70% e Hit >= 60%) nos filtros selecionados.")
+
+# --- Tempos do Rerun ---
+registro_tempos = timer.registro(
+    pagina=st.session_state.get("nav_radio"),
+    local=st.session_state.get("radio_local"),
+    periodo=st.session_state.get("combo_qtd"),
+)
+if TIMING_LOG:
+    write_timing_log(TIMING_LOG, registro_tempos)
+
+# Painel de debug (opt-in): abrir o app com ?debug=1
+if st.query_params.get("debug") == "1":
+    with st.sidebar.expander("⏱️ Debug: tempos do rerun", expanded=True):
+        st.caption(f"Total: {registro_tempos['total_ms']:.0f} ms")
+        st.dataframe(pd.DataFrame(list(registro_tempos["stages"].items()), columns=["Etapa", "ms"]),
+                     hide_index=True, use_container_width=True,
+                     column_config={"ms": st.column_config.NumberColumn("ms", format="%.1f")})
+        cache_stats = _analysis_cache().stats()
+        st.caption(f"Cache de seleções: {cache_stats['entradas']} entradas, {cache_stats['MB']:.1f}/{cache_stats['limite MB']:.0f} MB, "
+                   f"hit rate {cache_stats['hit rate']:.0%} ({cache_stats['hits']} hits / {cache_stats['misses']} misses), "
+                   f"{cache_stats['evictions']} evictions, {cache_stats['rejeitados']} rejeitados, {cache_stats['obsoletos']} obsoletos")
+        prefetcher = _prefetcher()
+        st.caption(f"Prefetch: {prefetcher.pendentes()} na fila, {prefetcher.executadas} executadas, {prefetcher.erros} erros")
+        pronto = read_ready(ready_file_path(BASE_DIR, st.get_option("server.port")))
+        st.caption(f"Aquecimento: pronto desde {pronto['ts']} ({pronto['total_ms'] / 1000:.1f}s)" if pronto
+                   else "Aquecimento: sem arquivo de prontidão (app iniciado sem carielonba.warmup --serve)")
+        # Nomes de linhas.csv que não casaram com nenhum jogador (ou com mais de um)
+        problemas_nomes = [f"{p.replace('_', ' ')}: {', '.join(lista)}" for p, lista in linhas_data.nomes.items() if lista]
+        if problemas_nomes:
+            st.caption("linhas.csv — " + " | ".join(problemas_nomes))
+        if TIMING_LOG and TIMING_LOG != "-":
+            resumo = summarize_timing_log(TIMING_LOG, ultimos=500)
+            if not resumo.empty:
+                st.caption("Últimos 500 reruns (p50 / p95)")
+                st.dataframe(resumo, hide_index=True, use_container_width=True,
+                             column_config={c: st.column_config.NumberColumn(c, format="%.1f") for c in ["p50 ms", "p95 ms", "máx ms"]})
\ No newline at end of file